@@ -0,0 +1,162 @@
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.urls import Resolver404, resolve
+
+# Быстрые эндпоинты чтения, которые обрабатываются в отдельном пуле
+# потоков и не ждут освобождения потоков, занятых медленными запросами.
+READ_VIEWS = {
+    'recipes:tag-list',
+    'recipes:tag-detail',
+    'recipes:ingredient-list',
+    'recipes:ingredient-detail',
+    'recipes:recipe-list',
+    'recipes:recipe-detail',
+    'users:user-me',
+}
+READ_METHODS = ('GET', 'HEAD')
+
+
+def build_environ(scope, body):
+    """Метод получения WSGI окружения из ASGI scope HTTP запроса."""
+    script_name = scope.get('root_path', '')
+    path = scope['path']
+    if script_name and path.startswith(script_name):
+        path = path[len(script_name):]
+    server_name, server_port = scope.get('server') or ('localhost', None)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name.encode().decode('latin1'),
+        'PATH_INFO': path.encode().decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port or 80),
+        'SERVER_PROTOCOL': f'HTTP/{scope["http_version"]}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope['headers']:
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_LENGTH', 'CONTENT_TYPE'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin1')
+        environ[name] = (
+            f'{environ[name]},{value}' if name in environ else value)
+    return environ
+
+
+class ASGIHandler:
+    """
+    Класс ASGI приложения. Django 2.2 не умеет обрабатывать запросы
+    асинхронно, поэтому запросы выполняются WSGI приложением в пулах
+    потоков, а цикл событий принимает соединения и передает ответы.
+    Быстрые эндпоинты чтения из READ_VIEWS выполняются в отдельном
+    пуле и не ждут за загрузками картинок и формированием PDF.
+    """
+
+    def __init__(self, wsgi_application):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            settings.ASGI_THREADS, thread_name_prefix='asgi')
+        self.read_executor = ThreadPoolExecutor(
+            settings.ASGI_READ_THREADS, thread_name_prefix='asgi-read')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f'Неподдерживаемый тип соединения: {scope["type"]}')
+        body = await self.read_body(receive)
+        if body is None:
+            return None
+        environ = build_environ(scope, body)
+        executor = (
+            self.read_executor if self.is_read(environ)
+            else self.executor)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, self.handle, loop, environ, send)
+
+    async def lifespan(self, receive, send):
+        """Метод обработки событий запуска и остановки сервера."""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                self.read_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        """
+        Метод чтения тела запроса. Возвращает None,
+        если клиент отключился раньше.
+        """
+        body = io.BytesIO()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body'):
+                return body.getvalue()
+
+    def is_read(self, environ):
+        """Метод проверки, относится ли запрос к быстрым на чтение."""
+        if environ['REQUEST_METHOD'] not in READ_METHODS:
+            return False
+        try:
+            match = resolve(environ['PATH_INFO'])
+        except Resolver404:
+            return False
+        return match.view_name in READ_VIEWS
+
+    def handle(self, loop, environ, send):
+        """
+        Метод обработки запроса WSGI приложением в потоке пула.
+        Ответ передается серверу по частям по мере формирования, весь
+        запрос, включая закрытие ответа и соединения с базой,
+        выполняется в одном потоке.
+        """
+        def send_message(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        start = {}
+
+        def start_response(status, headers, exc_info=None):
+            start.update(
+                type='http.response.start', status=int(status.split()[0]),
+                headers=[
+                    (name.lower().encode('latin1'), value.encode('latin1'))
+                    for name, value in headers])
+
+        response = self.wsgi_application(environ, start_response)
+        try:
+            send_message(start)
+            for chunk in response:
+                if chunk:
+                    send_message({
+                        'type': 'http.response.body', 'body': chunk,
+                        'more_body': True})
+            send_message({'type': 'http.response.body'})
+        finally:
+            close = getattr(response, 'close', None)
+            if close is not None:
+                close()
+
+
+def get_asgi_application():
+    return ASGIHandler(get_wsgi_application())
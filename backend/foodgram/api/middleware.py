@@ -0,0 +1,154 @@
+import inspect
+import json
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.fields import Field
+
+logger = logging.getLogger('foodgram.profiling')
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+LISTS = re.compile(r'\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)')
+ROWS = re.compile(r'\(\.\.\.\)(?:, \(\.\.\.\))+')
+UNIONS = re.compile(r'(?: UNION ALL SELECT (?:%s|\?)(?:, (?:%s|\?))*)+')
+SPACES = re.compile(r'\s+')
+TOP_QUERIES = 5
+
+
+def fingerprint(sql):
+    """
+    Метод нормализации SQL запроса: литералы и списки параметров
+    заменяются заполнителями, чтобы одинаковые запросы с разными
+    параметрами совпадали.
+    """
+    sql = LITERALS.sub('?', sql)
+    sql = LISTS.sub('(...)', sql)
+    sql = ROWS.sub('(...), ...', sql)
+    sql = UNIONS.sub(' UNION ALL ...', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def origin():
+    """
+    Метод поиска места, из которого выполнен запрос: поля сериализатора,
+    значение которого вычислялось, и ближайшей строки кода проекта.
+    Сериализатор без имени поля (элемент many=True или сам сериализатор
+    внутри своего метода get_*) пропускается в пользу внешнего поля.
+    """
+    field = location = None
+    frame = inspect.currentframe()
+    while frame is not None and (field is None or location is None):
+        instance = frame.f_locals.get('self')
+        if (field is None and isinstance(instance, Field)
+                and instance.parent is not None and instance.field_name):
+            field = f'{type(instance.parent).__name__}.{instance.field_name}'
+        filename = frame.f_code.co_filename
+        if (location is None and filename.startswith(settings.BASE_DIR)
+                and filename != __file__):
+            path = os.path.relpath(filename, settings.BASE_DIR)
+            location = f'{path}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return ', '.join(filter(None, (field, location))) or None
+
+
+class QueryStats:
+    """Класс сбора статистики SQL запросов одного HTTP запроса."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+        self.queries = defaultdict(lambda: {'count': 0, 'duration': 0})
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            query = self.queries[fingerprint(sql)]
+            query['count'] += 1
+            query['duration'] += duration
+            if query['count'] == settings.REQUEST_PROFILING_REPEATED_QUERIES:
+                query['origin'] = origin()
+
+    def repeated(self):
+        """Метод получения запросов, повторенных подозрительно много раз."""
+        return {
+            sql: query for sql, query in self.queries.items()
+            if query['count'] >= settings.REQUEST_PROFILING_REPEATED_QUERIES}
+
+    def top(self):
+        """Метод получения запросов, занявших больше всего времени."""
+        queries = sorted(
+            self.queries.items(), key=lambda item: -item[1]['duration'])
+        return [
+            {'sql': sql, 'count': query['count'],
+             'ms': round(query['duration'] * 1000, 2),
+             'origin': query.get('origin')}
+            for sql, query in queries[:TOP_QUERIES]]
+
+
+class QueryProfilingMiddleware:
+    """
+    Класс промежуточного слоя для профилирования запросов. Считает SQL
+    запросы и их время, находит повторяющиеся запросы (N+1), добавляет
+    заголовок Server-Timing и пишет в лог медленные запросы.
+    Подключается настройкой REQUEST_PROFILING, иначе исключается
+    из цепочки при запуске и не влияет на скорость.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        request.profiling = {'start': time.perf_counter()}
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        end = time.perf_counter()
+        timings = request.profiling
+        view_start = timings.get('view', timings['start'])
+        render_start = timings.get('render', end)
+        total = end - timings['start']
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration * 1000:.1f}' for name, duration in (
+                ('db', stats.duration),
+                ('serialize', max(
+                    render_start - view_start - stats.duration, 0)),
+                ('render', end - render_start),
+                ('total', total)))
+        repeated = stats.repeated()
+        if total * 1000 >= settings.REQUEST_PROFILING_SLOW_MS or repeated:
+            match = request.resolver_match
+            logger.warning(json.dumps({
+                'method': request.method,
+                'path': request.get_full_path(),
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'ms': round(total * 1000, 2),
+                'db_ms': round(stats.duration * 1000, 2),
+                'queries': stats.count,
+                'repeated': len(repeated),
+                'top': stats.top(),
+            }, ensure_ascii=False))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.profiling['view'] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        request.profiling['render'] = time.perf_counter()
+        return response
@@ -1,6 +1,79 @@
-from rest_framework.pagination import PageNumberPagination
+from collections import OrderedDict
+
+from django.db import connections
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
 
 
 class PageLimitPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class LimitCursorPagination(CursorPagination):
+    """
+    Класс пагинации по курсору. Стоимость любой страницы одинакова,
+    так как вместо OFFSET используется условие по id.
+    """
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = '-id'
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Метод получения сортировки. Сортировка, заданная в выборке
+        фильтрами, важнее сортировки по умолчанию.
+        """
+        ordering = queryset.query.order_by
+        if ordering and all(isinstance(field, str) for field in ordering):
+            return tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = self.get_approximate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_approximate_count(self, queryset):
+        """
+        Метод получения приблизительного количества объектов из
+        статистики PostgreSQL. Для отфильтрованной выборки не считается.
+        """
+        connection = connections[queryset.db]
+        if queryset.query.where or connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                (queryset.model._meta.db_table, ))
+            row = cursor.fetchone()
+        return row[0] if row and row[0] >= 0 else None
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class OptionalCursorPagination(PageLimitPagination):
+    """
+    Класс постраничной пагинации с переходом на пагинацию по курсору,
+    если в запросе передан параметр cursor (пустой для первой страницы).
+    """
+    cursor_pagination_class = LimitCursorPagination
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        paginator_class = self.cursor_pagination_class
+        if paginator_class.cursor_query_param in request.query_params:
+            self.cursor_paginator = paginator_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,94 @@
+from api.asgi import ASGIHandler, build_environ
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.core.wsgi import get_wsgi_application
+from django.test import SimpleTestCase
+
+
+def http_scope(method, path, query_string=b'', headers=()):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': query_string,
+        'headers': list(headers),
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+
+
+class ASGIHandlerTest(SimpleTestCase):
+    """Тесты ASGI приложения поверх WSGI приложения Django."""
+
+    def setUp(self):
+        self.handler = ASGIHandler(get_wsgi_application())
+        self.addCleanup(self.handler.executor.shutdown)
+        self.addCleanup(self.handler.read_executor.shutdown)
+
+    def test_build_environ(self):
+        environ = build_environ(http_scope(
+            'POST', '/api/рецепты/', b'limit=6', [
+                (b'content-type', b'application/json'),
+                (b'content-length', b'2'),
+                (b'x-forwarded-for', b'10.0.0.1'),
+                (b'x-forwarded-for', b'10.0.0.2')]), b'{}')
+        self.assertEqual(environ['REQUEST_METHOD'], 'POST')
+        self.assertEqual(
+            environ['PATH_INFO'].encode('latin1').decode(), '/api/рецепты/')
+        self.assertEqual(environ['QUERY_STRING'], 'limit=6')
+        self.assertEqual(environ['CONTENT_TYPE'], 'application/json')
+        self.assertEqual(environ['CONTENT_LENGTH'], '2')
+        self.assertEqual(
+            environ['HTTP_X_FORWARDED_FOR'], '10.0.0.1,10.0.0.2')
+        self.assertEqual(environ['REMOTE_ADDR'], '127.0.0.1')
+        self.assertEqual(environ['wsgi.input'].read(), b'{}')
+
+    def test_read_views(self):
+        for method, path, expected in (
+                ('GET', '/api/tags/', True),
+                ('GET', '/api/ingredients/1/', True),
+                ('GET', '/api/recipes/', True),
+                ('HEAD', '/api/recipes/1/', True),
+                ('GET', '/api/users/me/', True),
+                ('POST', '/api/recipes/', False),
+                ('GET', '/api/recipes/download_shopping_cart/', False),
+                ('GET', '/api/users/subscriptions/', False),
+                ('GET', '/missing/', False)):
+            with self.subTest(method=method, path=path):
+                self.assertEqual(
+                    self.handler.is_read(build_environ(
+                        http_scope(method, path), b'')),
+                    expected)
+
+    @async_to_sync
+    async def test_response(self):
+        communicator = ApplicationCommunicator(
+            self.handler, http_scope('GET', '/missing/'))
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output()
+        self.assertEqual(start['type'], 'http.response.start')
+        self.assertEqual(start['status'], 404)
+        body = b''
+        while True:
+            message = await communicator.receive_output()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        self.assertTrue(body)
+
+    @async_to_sync
+    async def test_lifespan(self):
+        communicator = ApplicationCommunicator(
+            self.handler, {'type': 'lifespan'})
+        await communicator.send_input({'type': 'lifespan.startup'})
+        self.assertEqual(
+            await communicator.receive_output(),
+            {'type': 'lifespan.startup.complete'})
+        await communicator.send_input({'type': 'lifespan.shutdown'})
+        self.assertEqual(
+            await communicator.receive_output(),
+            {'type': 'lifespan.shutdown.complete'})
+        await communicator.wait()
@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from recipe_catalogue import caching, membership
+from recipe_catalogue.models import Favorite, Recipe, Tag
+from rest_framework.test import APIClient
+from users.models import User
+
+
+class ReferenceCacheTest(TransactionTestCase):
+    """Тесты кэширования справочных эндпоинтов."""
+
+    def setUp(self):
+        caching.get_cache().clear()
+        self.tag = Tag.objects.create(
+            name='Завтрак', color='#E26C2D', slug='breakfast')
+        self.client = APIClient()
+
+    def test_etag_depends_on_data(self):
+        etag = self.client.get('/api/tags/')['ETag']
+        caching.get_cache().clear()
+        self.assertEqual(self.client.get('/api/tags/')['ETag'], etag)
+        response = self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.tag.name = 'Обед'
+        self.tag.save()
+        response = self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['name'], 'Обед')
+
+
+@override_settings(MEMBERSHIP_CACHE_TIMEOUT=300)
+class MembershipCacheTest(TransactionTestCase):
+    """Тесты кэширования принадлежностей пользователя."""
+
+    def test_invalidated_after_commit(self):
+        membership.get_cache().clear()
+        user = User.objects.create(email='user@foodgram.ru', username='user')
+        recipe = Recipe.objects.create(
+            author=user, name='recipe', text='text', cooking_time=1)
+        key = membership.MEMBERSHIP_KEY.format(user_id=user.id)
+        with transaction.atomic():
+            Favorite.objects.create(user=user, recipe=recipe)
+            # Параллельный запрос сохраняет принадлежности до фиксации.
+            membership.get_cache().set(key, membership.EMPTY)
+        self.assertEqual(
+            membership.load_membership(user).favorites, {recipe.id})
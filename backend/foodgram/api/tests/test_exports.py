@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from recipe_catalogue import exports
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ShoppingListExportTest(SimpleTestCase):
+    """Тесты фонового формирования и очистки списков покупок."""
+
+    def setUp(self):
+        exports.get_cache().clear()
+        self.addCleanup(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
+
+    @mock.patch.object(exports, 'executor')
+    def test_failed_job_can_be_resubmitted(self, executor):
+        exports.submit('version', [])
+        exports.submit('version', [])
+        self.assertEqual(executor.submit.call_count, 1)
+        self.assertEqual(exports.status('version'), exports.PENDING)
+        with mock.patch.object(exports.pdf, 'pfd_table', side_effect=OSError):
+            with self.assertLogs('foodgram.exports'):
+                exports.run('version', [])
+        self.assertEqual(exports.status('version'), exports.FAILED)
+        exports.submit('version', [])
+        self.assertEqual(executor.submit.call_count, 2)
+        self.assertEqual(exports.status('version'), exports.PENDING)
+        exports.run('version', [])
+        self.assertEqual(exports.status('version'), exports.DONE)
+
+    def test_clean_shopping_lists(self):
+        old = exports.render('old', [])
+        new = exports.render('new', [])
+        past = time.time() - 2 * 24 * 60 * 60
+        os.utime(old, (past, past))
+        call_command('clean_shopping_lists', stdout=StringIO())
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+
+    def test_render_refreshes_artifact(self):
+        path = exports.render('version', [])
+        past = time.time() - 2 * 24 * 60 * 60
+        os.utime(path, (past, past))
+        exports.render('version', [])
+        self.assertGreater(os.stat(path).st_mtime, past)
@@ -0,0 +1,59 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+from recipe_catalogue import imaging
+from recipe_catalogue.models import Recipe
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+@mock.patch.object(imaging, 'close_old_connections', mock.Mock())
+class RecipeImageVariantsTest(TestCase):
+    """Тесты формирования уменьшенных копий картинок рецептов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email='author@foodgram.ru', username='author')
+
+    def setUp(self):
+        self.addCleanup(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
+
+    def create_recipe(self, image):
+        return Recipe.objects.create(
+            author=self.author, name='recipe', text='text', cooking_time=1,
+            image=image)
+
+    def test_variants_are_marked_ready(self):
+        buffer = BytesIO()
+        Image.new('RGB', (2000, 1000)).save(buffer, 'PNG')
+        name = default_storage.save(
+            'recipe/image.png', ContentFile(buffer.getvalue()))
+        recipe = self.create_recipe(name)
+        self.assertEqual(
+            imaging.variant_urls(recipe.image, recipe.image_variants),
+            dict.fromkeys(imaging.VARIANTS, recipe.image.url))
+        imaging.process_image(name)
+        recipe.refresh_from_db()
+        self.assertTrue(recipe.image_variants)
+        for variant, url in imaging.variant_urls(
+                recipe.image, recipe.image_variants).items():
+            with self.subTest(variant=variant):
+                path = imaging.variant_name(name, variant)
+                self.assertTrue(default_storage.exists(path))
+                self.assertEqual(url, default_storage.url(path))
+
+    def test_failure_is_logged(self):
+        recipe = self.create_recipe('recipe/missing.png')
+        with self.assertLogs('foodgram.imaging', 'ERROR'):
+            imaging.process_image(recipe.image.name)
+        recipe.refresh_from_db()
+        self.assertFalse(recipe.image_variants)
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from recipe_catalogue.deduplication import merge_duplicate_ingredients
+from recipe_catalogue.management.commands import load_ingredients
+from recipe_catalogue.models import Ingredient, Recipe, RecipeIngredient
+from users.models import User
+
+
+class LoadIngredientsTest(TestCase):
+    """Тесты загрузки ингредиентов из файла."""
+
+    def load(self, suffix, content):
+        file = tempfile.NamedTemporaryFile(
+            'w', suffix=suffix, encoding='utf-8', delete=False)
+        self.addCleanup(os.remove, file.name)
+        with file:
+            file.write(content)
+        call_command('load_ingredients', file.name, stdout=StringIO())
+
+    @mock.patch.object(load_ingredients, 'CHUNK_SIZE', 7)
+    def test_json_is_read_in_chunks(self):
+        items = [
+            {'name': f'ингредиент {num}', 'measurement_unit': 'г'}
+            for num in range(20)]
+        self.load('.json', json.dumps(items, ensure_ascii=False, indent=1))
+        self.assertEqual(Ingredient.objects.count(), 20)
+
+    def test_invalid_json(self):
+        for content in ('{}', '[{"name": "соль"', '[{"name": "соль"}]'):
+            with self.subTest(content=content):
+                with self.assertRaises(CommandError):
+                    self.load('.json', content)
+        self.assertFalse(Ingredient.objects.exists())
+
+    def test_short_csv_row(self):
+        with self.assertRaisesMessage(CommandError, 'Строка 2'):
+            self.load('.csv', 'соль,г\nперец\n')
+        self.assertFalse(Ingredient.objects.exists())
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    'Ограничения снимаются только в PostgreSQL')
+class MergeDuplicateIngredientsTest(TestCase):
+    """Тесты слияния дубликатов ингредиентов перед миграциями."""
+
+    def test_merge(self):
+        with connection.cursor() as cursor:
+            for table, constraint in (
+                    (Ingredient._meta.db_table, 'unique_ingredient'),
+                    (RecipeIngredient._meta.db_table,
+                     'unique_ingredients_recipe')):
+                cursor.execute(
+                    f'ALTER TABLE {table} DROP CONSTRAINT {constraint}')
+        author = User.objects.create(email='a@foodgram.ru', username='a')
+        first, second = Recipe.objects.bulk_create(
+            Recipe(author=author, name=name, text='text', cooking_time=1)
+            for name in ('first', 'second'))
+        salt, *duplicates = Ingredient.objects.bulk_create(
+            Ingredient(name='соль', measurement_unit='г') for _ in range(3))
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(recipe=first, ingredient=salt, amount=1),
+            RecipeIngredient(recipe=first, ingredient=duplicates[0], amount=2),
+            RecipeIngredient(
+                recipe=second, ingredient=duplicates[1], amount=3)])
+        merge_duplicate_ingredients()
+        self.assertEqual(list(Ingredient.objects.all()), [salt])
+        self.assertEqual(
+            sorted(RecipeIngredient.objects.values_list(
+                'recipe', 'ingredient', 'amount')),
+            [(first.id, salt.id, 3), (second.id, salt.id, 3)])
@@ -0,0 +1,111 @@
+import json
+from unittest import mock
+
+from api import middleware
+from api.middleware import QueryProfilingMiddleware, fingerprint
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from rest_framework import serializers
+from users.models import User
+
+USERS = 5
+
+
+class UserRecipesSerializer(serializers.Serializer):
+    """Сериализатор с запросом на каждый объект (N+1)."""
+    recipes = serializers.SerializerMethodField()
+
+    def get_recipes(self, obj):
+        return obj.recipes.count()
+
+
+class FingerprintTest(SimpleTestCase):
+    """Тесты нормализации SQL запросов."""
+
+    def test_fingerprint(self):
+        for sql, expected in (
+                ("SELECT * FROM t WHERE id = 15 AND name = 'a''b'",
+                 'SELECT * FROM t WHERE id = ? AND name = ?'),
+                ('SELECT * FROM t WHERE price > 1.5',
+                 'SELECT * FROM t WHERE price > ?'),
+                ('SELECT * FROM t WHERE id IN (%s, %s, %s)',
+                 'SELECT * FROM t WHERE id IN (...)'),
+                ('SELECT * FROM t WHERE id IN (?)',
+                 'SELECT * FROM t WHERE id IN (...)'),
+                ('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)',
+                 'INSERT INTO t (a, b) VALUES (...), ...'),
+                ('INSERT INTO t (a, b) SELECT %s, %s '
+                 'UNION ALL SELECT %s, %s UNION ALL SELECT %s, %s',
+                 'INSERT INTO t (a, b) SELECT %s, %s UNION ALL ...'),
+                ('SELECT  *\n  FROM t', 'SELECT * FROM t')):
+            with self.subTest(sql=sql):
+                self.assertEqual(fingerprint(sql), expected)
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s, %s)'))
+
+
+class QueryProfilingMiddlewareTest(TestCase):
+    """Тесты промежуточного слоя профилирования запросов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(email=f'user{num}@foodgram.ru', username=f'user{num}')
+            for num in range(USERS))
+
+    def profile(self, get_response):
+        request = RequestFactory().get('/profiled/')
+        return QueryProfilingMiddleware(get_response)(request)
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryProfilingMiddleware(HttpResponse)
+        self.assertNotIn('Server-Timing', self.client.get('/api/tags/'))
+
+    @override_settings(REQUEST_PROFILING=True)
+    def test_server_timing(self):
+        response = self.client.get('/api/tags/')
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+, serialize;dur=[\d.]+, '
+            r'render;dur=[\d.]+, total;dur=[\d.]+$')
+
+    @override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SLOW_MS=0)
+    def test_slow_request_is_logged(self):
+        with self.assertLogs('foodgram.profiling', 'WARNING') as logs:
+            self.profile(lambda request: HttpResponse(
+                User.objects.count()))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['method'], 'GET')
+        self.assertEqual(record['path'], '/profiled/')
+        self.assertEqual(record['queries'], 1)
+        self.assertEqual(record['repeated'], 0)
+
+    @override_settings(
+        REQUEST_PROFILING=True, REQUEST_PROFILING_SLOW_MS=60 * 1000)
+    def test_repeated_queries_are_logged(self):
+        with self.assertLogs('foodgram.profiling', 'WARNING') as logs:
+            self.profile(lambda request: HttpResponse(json.dumps(
+                UserRecipesSerializer(User.objects.all(), many=True).data)))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['queries'], USERS + 1)
+        self.assertEqual(record['repeated'], 1)
+        query = record['top'][0]
+        self.assertEqual(query['count'], USERS)
+        self.assertRegex(
+            query['origin'],
+            r'^UserRecipesSerializer\.recipes, '
+            r'api/tests/test_middleware\.py:\d+ in get_recipes$')
+
+    @override_settings(
+        REQUEST_PROFILING=True, REQUEST_PROFILING_SLOW_MS=60 * 1000)
+    def test_fast_request_is_not_logged(self):
+        with mock.patch.object(middleware.logger, 'warning') as warning:
+            self.profile(lambda request: HttpResponse(
+                User.objects.count()))
+        warning.assert_not_called()
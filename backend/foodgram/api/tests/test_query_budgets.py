@@ -0,0 +1,334 @@
+import base64
+import io
+import tempfile
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from recipe_catalogue import caching, pantry, search
+from recipe_catalogue.models import (Favorite, Ingredient, Recipe,
+                                     RecipeIngredient, RecipeScore, RecipeTag,
+                                     ShoppingCart, Tag)
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import Subscription, User
+
+# Количество SQL запросов каждого эндпоинта. Оно не должно зависеть
+# ни от размера страницы, ни от числа связанных объектов, поэтому
+# одинаково для обоих объемов данных. Запросы выполняются с пустым
+# кэшем, поэтому справочники учитывают и вычисление ETag по данным.
+QUERY_BUDGETS = {
+    'recipes-list': 8,
+    'recipes-list-cursor': 7,
+    'recipes-list-filtered': 10,
+    'recipes-list-anonymous': 4,
+    'recipes-detail': 7,
+    'recipes-create': 21,
+    'recipes-update': 22,
+    'recipes-delete': 12,
+    'recipes-favorite': 6,
+    'recipes-favorite-delete': 6,
+    'recipes-shopping-cart': 6,
+    'recipes-shopping-cart-delete': 6,
+    'recipes-download-shopping-cart': 2,
+    'recipes-shopping-cart-export': 2,
+    'recipes-feed': 8,
+    'recipes-cookable': 7,
+    'users-list': 6,
+    'users-detail': 5,
+    'users-me': 4,
+    'users-subscribe': 8,
+    'users-subscribe-delete': 5,
+    'users-subscriptions': 4,
+    'tags-list': 3,
+    'tags-detail': 3,
+    'ingredients-list': 3,
+    'ingredients-search': 2,
+    'ingredients-detail': 3,
+}
+# Отличия бюджетов для отдельных СУБД. В PostgreSQL курсорная
+# пагинация дополнительно читает приблизительное количество
+# рецептов из статистики pg_class.
+VENDOR_QUERY_BUDGETS = {
+    'postgresql': {
+        'recipes-list-cursor': 8,
+    },
+}
+SMALL = {
+    'users': 3, 'recipes_per_user': 2, 'ingredients_per_recipe': 1,
+    'tags_per_recipe': 1, 'favorites': 2, 'subscriptions': 1,
+    'ingredients': 5, 'tags': 3,
+}
+LARGE = {
+    'users': 15, 'recipes_per_user': 6, 'ingredients_per_recipe': 8,
+    'tags_per_recipe': 4, 'favorites': 30, 'subscriptions': 12,
+    'ingredients': 40, 'tags': 6,
+}
+PAGE_SIZES = (1, 10)
+
+
+def make_image():
+    """Метод получения картинки рецепта в формате base64."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (1, 1)).save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()).decode()
+
+
+class QueryBudgetMixin:
+    """
+    Класс-примесь тестов количества SQL запросов эндпоинтов API.
+    Списки запрашиваются со страницами разного размера, данные
+    создаются в объеме scale.
+    """
+    scale = None
+
+    @classmethod
+    def setUpTestData(cls):
+        scale = cls.scale
+        User.objects.bulk_create(
+            User(email=f'user{num}@foodgram.ru', username=f'user{num}')
+            for num in range(scale['users'] + 1))
+        cls.user, *authors = User.objects.order_by('id')
+        cls.token = Token.objects.create(user=cls.user)
+        Tag.objects.bulk_create(
+            Tag(name=f'tag{num}', slug=f'tag{num}', color=f'#0000{num:02}')
+            for num in range(scale['tags']))
+        cls.tags = list(Tag.objects.order_by('id'))
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'ingredient{num}', measurement_unit='г')
+            for num in range(scale['ingredients']))
+        cls.ingredients = list(Ingredient.objects.order_by('id'))
+        Recipe.objects.bulk_create(
+            Recipe(author=author, name=f'recipe{num}', text='text',
+                   cooking_time=num + 1, image='recipe/budget.png')
+            for author in [cls.user] + authors
+            for num in range(scale['recipes_per_user']))
+        recipes = list(Recipe.objects.order_by('id'))
+        RecipeScore.objects.bulk_create(
+            RecipeScore(recipe=recipe, trending=num)
+            for num, recipe in enumerate(recipes))
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, amount=shift + 1,
+                ingredient=cls.ingredients[(num + shift) % len(
+                    cls.ingredients)])
+            for num, recipe in enumerate(recipes)
+            for shift in range(scale['ingredients_per_recipe']))
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag=cls.tags[(num + shift) % len(
+                cls.tags)])
+            for num, recipe in enumerate(recipes)
+            for shift in range(scale['tags_per_recipe']))
+        others = recipes[scale['recipes_per_user']:]
+        for model in (Favorite, ShoppingCart):
+            model.objects.bulk_create(
+                model(user=cls.user, recipe=recipe)
+                for recipe in others[:scale['favorites']])
+        Subscription.objects.bulk_create(
+            Subscription(user=cls.user, author=author)
+            for author in authors[:scale['subscriptions']])
+        cls.recipe = recipes[0]
+        cls.other_recipe = others[0]
+        cls.author = authors[0]
+        cls.stranger = authors[-1]
+
+    def setUp(self):
+        search.build_index()
+        pantry.build_index()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = self.settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def count_queries(self, method, path, data=None, status=200):
+        """
+        Метод выполнения запроса с подсчетом SQL запросов.
+        Запрос выполняется с пустым кэшем, чтобы результат
+        не зависел от предыдущих запросов.
+        """
+        caching.get_cache().clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(self.client, method)(
+                path, data, format='json')
+        self.assertEqual(
+            response.status_code, status,
+            getattr(response, 'data', None))
+        return len(captured)
+
+    def assert_budget(self, name, method, path, data=None, status=200):
+        """
+        Метод проверки количества SQL запросов эндпоинта с учетом
+        отличий для используемой СУБД.
+        """
+        budget = VENDOR_QUERY_BUDGETS.get(connection.vendor, {}).get(
+            name, QUERY_BUDGETS[name])
+        self.assertEqual(
+            self.count_queries(method, path, data, status), budget, name)
+
+    def assert_list_budget(self, name, path, status=200):
+        """
+        Метод проверки количества SQL запросов списка для страниц
+        разного размера. Путь содержит заполнитель {limit}.
+        """
+        for limit in PAGE_SIZES:
+            with self.subTest(limit=limit):
+                self.assert_budget(
+                    name, 'get', path.format(limit=limit), status=status)
+
+    def recipe_data(self):
+        """Метод получения данных для создания и изменения рецепта."""
+        count = self.scale['ingredients_per_recipe']
+        return {
+            'name': 'Новый рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': make_image(),
+            'tags': [tag.id for tag in self.tags[-self.scale[
+                'tags_per_recipe']:]],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 5}
+                for ingredient in self.ingredients[-count:]],
+        }
+
+    def test_recipes_list(self):
+        self.assert_list_budget('recipes-list', '/api/recipes/?limit={limit}')
+
+    def test_recipes_list_cursor(self):
+        self.assert_list_budget(
+            'recipes-list-cursor', '/api/recipes/?cursor=&limit={limit}')
+
+    def test_recipes_list_filtered(self):
+        tags = '&'.join(f'tags={tag.slug}' for tag in self.tags)
+        self.assert_list_budget(
+            'recipes-list-filtered',
+            f'/api/recipes/?is_favorited=1&{tags}&limit={{limit}}')
+
+    def test_recipes_list_anonymous(self):
+        self.client.credentials()
+        self.assert_list_budget(
+            'recipes-list-anonymous', '/api/recipes/?limit={limit}')
+
+    def test_recipes_detail(self):
+        self.assert_budget(
+            'recipes-detail', 'get', f'/api/recipes/{self.recipe.id}/')
+
+    def test_recipes_create(self):
+        self.assert_budget(
+            'recipes-create', 'post', '/api/recipes/', self.recipe_data(),
+            status=201)
+
+    def test_recipes_update(self):
+        self.assert_budget(
+            'recipes-update', 'patch', f'/api/recipes/{self.recipe.id}/',
+            self.recipe_data())
+
+    def test_recipes_delete(self):
+        self.assert_budget(
+            'recipes-delete', 'delete', f'/api/recipes/{self.recipe.id}/',
+            status=204)
+
+    def test_recipes_favorite(self):
+        self.assert_budget(
+            'recipes-favorite', 'post',
+            f'/api/recipes/{self.recipe.id}/favorite/', status=201)
+
+    def test_recipes_favorite_delete(self):
+        self.assert_budget(
+            'recipes-favorite-delete', 'delete',
+            f'/api/recipes/{self.other_recipe.id}/favorite/', status=204)
+
+    def test_recipes_shopping_cart(self):
+        self.assert_budget(
+            'recipes-shopping-cart', 'post',
+            f'/api/recipes/{self.recipe.id}/shopping_cart/', status=201)
+
+    def test_recipes_shopping_cart_delete(self):
+        self.assert_budget(
+            'recipes-shopping-cart-delete', 'delete',
+            f'/api/recipes/{self.other_recipe.id}/shopping_cart/',
+            status=204)
+
+    def test_recipes_download_shopping_cart(self):
+        self.assert_budget(
+            'recipes-download-shopping-cart', 'get',
+            '/api/recipes/download_shopping_cart/')
+
+    def test_recipes_shopping_cart_export(self):
+        self.assert_budget(
+            'recipes-shopping-cart-export', 'get',
+            '/api/recipes/shopping_cart_export/', status=404)
+
+    def test_recipes_feed(self):
+        self.assert_list_budget(
+            'recipes-feed', '/api/recipes/feed/?limit={limit}')
+
+    def test_recipes_cookable(self):
+        ingredients = '&'.join(
+            f'ingredients={ingredient.id}'
+            for ingredient in self.ingredients[::2])
+        self.assert_list_budget(
+            'recipes-cookable',
+            f'/api/recipes/cookable/?{ingredients}&limit={{limit}}')
+
+    def test_users_list(self):
+        self.assert_list_budget('users-list', '/api/users/?limit={limit}')
+
+    def test_users_detail(self):
+        self.assert_budget(
+            'users-detail', 'get', f'/api/users/{self.author.id}/')
+
+    def test_users_me(self):
+        self.assert_budget('users-me', 'get', '/api/users/me/')
+
+    def test_users_subscribe(self):
+        self.assert_budget(
+            'users-subscribe', 'post',
+            f'/api/users/{self.stranger.id}/subscribe/', status=201)
+
+    def test_users_subscribe_delete(self):
+        self.assert_budget(
+            'users-subscribe-delete', 'delete',
+            f'/api/users/{self.author.id}/subscribe/', status=204)
+
+    def test_users_subscriptions(self):
+        for recipes_limit in PAGE_SIZES:
+            with self.subTest(recipes_limit=recipes_limit):
+                self.assert_list_budget(
+                    'users-subscriptions',
+                    '/api/users/subscriptions/?limit={limit}'
+                    f'&recipes_limit={recipes_limit}')
+
+    def test_tags_list(self):
+        self.assert_budget('tags-list', 'get', '/api/tags/')
+
+    def test_tags_detail(self):
+        self.assert_budget(
+            'tags-detail', 'get', f'/api/tags/{self.tags[0].id}/')
+
+    def test_ingredients_list(self):
+        self.assert_budget('ingredients-list', 'get', '/api/ingredients/')
+
+    def test_ingredients_search(self):
+        self.assert_budget(
+            'ingredients-search', 'get', '/api/ingredients/?name=ingr')
+
+    def test_ingredients_detail(self):
+        self.assert_budget(
+            'ingredients-detail', 'get',
+            f'/api/ingredients/{self.ingredients[0].id}/')
+
+
+class SmallQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Тесты количества SQL запросов на малом объеме данных."""
+    scale = SMALL
+
+
+class LargeQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Тесты количества SQL запросов на большом объеме данных."""
+    scale = LARGE
@@ -0,0 +1,164 @@
+import re
+
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from recipe_catalogue.models import (Favorite, Ingredient, Recipe,
+                                     RecipeIngredient, RecipeScore, RecipeTag,
+                                     ShoppingCart, Tag)
+from users.models import Subscription, User
+
+USERS = 300
+RECIPES_PER_USER = 10
+INGREDIENTS = 500
+INGREDIENTS_PER_RECIPE = 5
+TAGS = 10
+FAVORITES_PER_USER = 30
+SUBSCRIPTIONS_PER_USER = 10
+
+SEQUENTIAL_SCAN = {
+    'postgresql': r'Seq Scan on {table}\b',
+    'sqlite': r'\bSCAN (TABLE )?{table}\b(?! USING)',
+}
+SORT = {
+    'postgresql': r'\bSort\b',
+    'sqlite': r'USE TEMP B-TREE FOR ORDER BY',
+}
+
+
+class QueryPlanTest(TestCase):
+    """
+    Тесты планов горячих запросов. Каждый запрос должен читать
+    ожидаемый индекс, а не всю таблицу, и получать из индекса
+    заданный порядок строк без отдельной сортировки.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(email=f'user{num}@foodgram.ru', username=f'user{num}')
+            for num in range(USERS))
+        users = list(User.objects.order_by('id'))
+        Tag.objects.bulk_create(
+            Tag(name=f'tag{num}', slug=f'tag{num}', color=f'#0000{num:02}')
+            for num in range(TAGS))
+        tags = list(Tag.objects.order_by('id'))
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'ingredient{num}')
+            for num in range(INGREDIENTS))
+        ingredients = list(Ingredient.objects.order_by('id'))
+        Recipe.objects.bulk_create(
+            Recipe(author=user, name=f'recipe{num}', text='text',
+                   cooking_time=num + 1, favorites_count=num)
+            for user in users for num in range(RECIPES_PER_USER))
+        recipes = list(Recipe.objects.order_by('id'))
+        RecipeScore.objects.bulk_create(
+            RecipeScore(recipe=recipe, trending=num % 97)
+            for num, recipe in enumerate(recipes))
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, amount=1,
+                ingredient=ingredients[(num + shift) % INGREDIENTS])
+            for num, recipe in enumerate(recipes)
+            for shift in range(INGREDIENTS_PER_RECIPE))
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag=tags[num % TAGS])
+            for num, recipe in enumerate(recipes))
+        for model in (Favorite, ShoppingCart):
+            model.objects.bulk_create(
+                model(user=user, recipe=recipes[(num * 7 + shift) % len(
+                    recipes)])
+                for num, user in enumerate(users)
+                for shift in range(FAVORITES_PER_USER))
+        Subscription.objects.bulk_create(
+            Subscription(user=user, author=users[(num + shift) % USERS])
+            for num, user in enumerate(users)
+            for shift in range(1, SUBSCRIPTIONS_PER_USER + 1))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        cls.user = users[USERS // 2]
+        cls.author = users[USERS // 3]
+        cls.recipe = recipes[len(recipes) // 2]
+        cls.tag = tags[0]
+
+    def assert_uses_index(self, queryset, index=None):
+        """
+        Метод проверки плана запроса: нет последовательного чтения
+        таблицы, используется индекс index, а явно заданный порядок
+        строк не требует сортировки. Индексы уникальных ограничений
+        в SQLite безымянные, поэтому для них index не указывается.
+        """
+        if connection.vendor not in SEQUENTIAL_SCAN:
+            self.skipTest(f'Нет правил разбора плана для {connection.vendor}')
+        plan = queryset.explain()
+        table = re.escape(queryset.model._meta.db_table)
+        self.assertIsNone(
+            re.search(SEQUENTIAL_SCAN[connection.vendor].format(
+                table=table), plan),
+            f'Последовательное чтение таблицы:\n{plan}')
+        if index is not None:
+            self.assertRegex(
+                plan, rf'\b{re.escape(index)}\b',
+                f'Не используется индекс {index}:\n{plan}')
+        if queryset.query.order_by:
+            self.assertIsNone(
+                re.search(SORT[connection.vendor], plan),
+                f'Сортировка вместо порядка индекса:\n{plan}')
+
+    def test_favorite_by_user_and_recipe(self):
+        self.assert_uses_index(Favorite.objects.filter(
+            user=self.user, recipe=self.recipe))
+
+    def test_favorite_by_user(self):
+        self.assert_uses_index(
+            Favorite.objects.filter(user=self.user).order_by('-id')[:6],
+            'favorite_user_id_idx')
+
+    def test_shopping_cart_by_user_and_recipe(self):
+        self.assert_uses_index(ShoppingCart.objects.filter(
+            user=self.user, recipe=self.recipe))
+
+    def test_shopping_cart_by_user(self):
+        self.assert_uses_index(
+            ShoppingCart.objects.filter(user=self.user).order_by('-id')[:6],
+            'cart_user_id_idx')
+
+    def test_subscription_by_user_and_author(self):
+        self.assert_uses_index(Subscription.objects.filter(
+            user=self.user, author=self.author))
+
+    def test_subscription_by_user(self):
+        self.assert_uses_index(
+            Subscription.objects.filter(user=self.user).order_by('-id')[:6],
+            'subscription_user_id_idx')
+
+    def test_recipe_ingredients_by_recipe(self):
+        self.assert_uses_index(
+            RecipeIngredient.objects.filter(recipe=self.recipe),
+            'recipe_ingredient_recipe_idx')
+
+    def test_recipes_by_author(self):
+        self.assert_uses_index(
+            Recipe.objects.filter(author=self.author).order_by('-id')[:6],
+            'recipe_author_id_idx')
+
+    def test_recipes_by_tag(self):
+        self.assert_uses_index(
+            RecipeTag.objects.filter(tag=self.tag).values('recipe_id'),
+            'recipe_tag_tag_recipe_idx')
+
+    def test_recipes_by_popularity(self):
+        self.assert_uses_index(
+            Recipe.objects.order_by('-favorites_count', '-id')[:6],
+            'recipe_favorites_count_idx')
+
+    def test_recipes_by_cooking_time(self):
+        self.assert_uses_index(
+            Recipe.objects.order_by('cooking_time', 'id')[:6],
+            'recipe_cooking_time_idx')
+
+    def test_recipes_by_trending(self):
+        self.assert_uses_index(Recipe.objects.filter(
+            score__isnull=False).annotate(trending=F(
+                'score__trending')).order_by('-trending', '-id')[:6],
+            'recipe_score_trending_idx')
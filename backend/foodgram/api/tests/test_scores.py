@@ -0,0 +1,49 @@
+from django.test import TestCase
+from django.utils import timezone
+from recipe_catalogue import scoring
+from recipe_catalogue.models import Favorite, Recipe, RecipeScore
+from rest_framework.test import APIClient
+from users.models import User
+
+
+class TrendingTest(TestCase):
+    """Тесты сортировки рецептов по оценке популярности."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            email='user@foodgram.ru', username='user')
+        Recipe.objects.bulk_create(
+            Recipe(author=cls.user, name=f'recipe{num}', text='text',
+                   cooking_time=1)
+            for num in range(3))
+        cls.recipes = list(Recipe.objects.order_by('id'))
+
+    def test_missing_scores_are_created(self):
+        self.assertFalse(RecipeScore.objects.exists())
+        scoring.update_scores(rebuild=True)
+        self.assertEqual(
+            set(RecipeScore.objects.values_list('recipe', flat=True)),
+            {recipe.id for recipe in self.recipes})
+
+    def test_trending_order(self):
+        scoring.update_scores()
+        RecipeScore.objects.filter(recipe=self.recipes[0]).update(trending=5)
+        client = APIClient()
+        expected = [
+            self.recipes[0].id, self.recipes[2].id, self.recipes[1].id]
+        for url in ('/api/recipes/?ordering=trending',
+                    '/api/recipes/?ordering=trending&cursor='):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(
+                    [recipe['id'] for recipe in response.data['results']],
+                    expected)
+
+    def test_created(self):
+        Favorite.objects.bulk_create(
+            [Favorite(user=self.user, recipe=self.recipes[0])])
+        self.assertIsNotNone(Favorite.objects.get().created)
+        self.assertLess(
+            scoring.event_score(Favorite, None),
+            scoring.event_score(Favorite, timezone.now()))
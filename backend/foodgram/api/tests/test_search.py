@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from recipe_catalogue import search
+from recipe_catalogue.models import Ingredient, Recipe
+from rest_framework.test import APIClient
+from users.models import User
+
+RECIPES = 15
+PAGE_SIZE = 4
+
+
+class RecipeSearchTest(TestCase):
+    """Тесты полнотекстового поиска рецептов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(
+            email='author@foodgram.ru', username='author')
+        for num in range(RECIPES):
+            Recipe.objects.create(
+                author=author, name=f'Суп {num}', cooking_time=1,
+                text=' '.join(['суп'] * (num % 4 + 1) + ['вода'] * num))
+        Recipe.objects.create(
+            author=author, name='Каша', text='крупа', cooking_time=1)
+
+    def test_cursor_pages_to_the_end(self):
+        client = APIClient()
+        url, params = '/api/recipes/', {
+            'search': 'суп', 'limit': PAGE_SIZE, 'cursor': ''}
+        ids = []
+        for _ in range(RECIPES):
+            response = client.get(url, params)
+            params = None
+            self.assertEqual(response.status_code, 200)
+            ids += [recipe['id'] for recipe in response.data['results']]
+            url = response.data['next']
+            if url is None:
+                break
+        self.assertIsNone(url, 'Пагинация по курсору не завершилась.')
+        self.assertEqual(len(ids), RECIPES)
+        self.assertEqual(
+            set(ids), set(Recipe.objects.filter(
+                name__startswith='Суп').values_list('id', flat=True)))
+
+
+class IngredientIndexTest(TransactionTestCase):
+    """Тесты сброса индекса ингредиентов."""
+
+    def test_rolled_back_ingredient_is_not_indexed(self):
+        search.build_index()
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Ingredient.objects.create(name='соль', measurement_unit='г')
+                search.get_index()
+                raise RuntimeError
+        self.assertEqual(search.search_ingredients('соль'), [])
+
+    def test_reset_after_commit(self):
+        search.build_index()
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.assertEqual(
+            [item['name'] for item in search.search_ingredients('соль')],
+            ['соль'])
@@ -0,0 +1,38 @@
+from django.test import TestCase
+from recipe_catalogue.models import Recipe
+from rest_framework.test import APIClient
+from users.models import Subscription, User
+
+
+class SubscriptionsTest(TestCase):
+    """Тесты эндпоинта подписок текущего пользователя."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            email='user@foodgram.ru', username='user')
+        author = User.objects.create(
+            email='author@foodgram.ru', username='author')
+        Recipe.objects.bulk_create(
+            Recipe(author=author, name=f'recipe{num}', text='text',
+                   cooking_time=1)
+            for num in range(3))
+        Subscription.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_recipes_limit(self):
+        response = self.client.get(
+            '/api/users/subscriptions/?recipes_limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results'][0]['recipes']), 2)
+
+    def test_invalid_recipes_limit(self):
+        for value in ('abc', '-1', ''):
+            with self.subTest(recipes_limit=value):
+                response = self.client.get(
+                    f'/api/users/subscriptions/?recipes_limit={value}')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('recipes_limit', response.data)
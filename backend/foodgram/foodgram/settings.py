@@ -29,6 +29,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,6 +73,23 @@ DATABASES = {
 }
 
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+REFERENCE_CACHE = 'default'
+REFERENCE_CACHE_TIMEOUT = 300
+# Время хранения принадлежностей пользователя между запросами.
+# При 0 они загружаются заново в каждом запросе, что безопасно
+# для кэша в памяти процесса при нескольких воркерах.
+MEMBERSHIP_CACHE_TIMEOUT = int(os.getenv('MEMBERSHIP_CACHE_TIMEOUT', 0))
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -123,6 +141,56 @@ REST_FRAMEWORK = {
 }
 PAGE_SIZE = 6
 
+# Shopping list export
+
+SHOPPING_LIST_EXPORT_WORKERS = int(
+    os.getenv('SHOPPING_LIST_EXPORT_WORKERS', 2))
+# Статусы задач хранятся в кэше. Чтобы их видели все процессы,
+# задайте общий кэш через CACHE_BACKEND и CACHE_LOCATION.
+SHOPPING_LIST_EXPORT_CACHE = 'default'
+SHOPPING_LIST_EXPORT_JOB_TIMEOUT = 10 * 60
+SHOPPING_LIST_EXPORT_FAILED_TIMEOUT = 5 * 60
+# Файлы, которые не скачивали дольше этого времени,
+# удаляет manage.py clean_shopping_lists.
+SHOPPING_LIST_MAX_AGE = int(
+    os.getenv('SHOPPING_LIST_MAX_AGE', 24 * 60 * 60))
+
+# Recipe images
+
+RECIPE_IMAGE_WORKERS = int(os.getenv('RECIPE_IMAGE_WORKERS', 2))
+RECIPE_IMAGE_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+RECIPE_IMAGE_MAX_PIXELS = 25_000_000
+
+# Ingredient search
+
+INGREDIENT_SEARCH_LIMIT = 50
+INGREDIENT_INDEX_TTL = 300
+
+# Recipe scores
+
+TRENDING_HALF_LIFE = int(os.getenv('TRENDING_HALF_LIFE', 2 * 24 * 60 * 60))
+
+# Subscription feed
+
+FEED_MERGE_THRESHOLD = 500
+
+# Recipe search by ingredients
+
+PANTRY_INDEX_TTL = 600
+
+# Request profiling
+
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING', 'False') == 'True'
+REQUEST_PROFILING_SLOW_MS = int(os.getenv('REQUEST_PROFILING_SLOW_MS', 500))
+REQUEST_PROFILING_REPEATED_QUERIES = 5
+
+# ASGI
+
+# Потоки одного процесса для обработки запросов и отдельно
+# для быстрых запросов на чтение (api.asgi.READ_VIEWS).
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', 8))
+ASGI_READ_THREADS = int(os.getenv('ASGI_READ_THREADS', 8))
+
 # Auth
 
 AUTH_USER_MODEL = 'users.User'
@@ -0,0 +1 @@
+default_app_config = 'recipe_catalogue.apps.RecipeCatalogueConfig'
@@ -9,6 +9,12 @@ class RecipeIngredientInline(admin.TabularInline):
     extra = 0
 
 
+class RecipeTagInline(admin.TabularInline):
+    model = models.RecipeTag
+    min_num = 1
+    extra = 0
+
+
 @admin.register(models.Recipe)
 class RecipeAdmin(admin.ModelAdmin):
     """Класс админки для модели рецептов."""
@@ -18,7 +24,7 @@ class RecipeAdmin(admin.ModelAdmin):
     list_filter = ('author', 'tags', )
     search_fields = (
         'name', 'author', 'get_ingredients', 'get_tags', )
-    inlines = (RecipeIngredientInline, )
+    inlines = (RecipeIngredientInline, RecipeTagInline, )
 
 
 @admin.register(models.Tag)
@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class RecipeCatalogueConfig(AppConfig):
     name = 'recipe_catalogue'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate, pre_migrate
+
+        from . import deduplication, fulltext, pdf, signals  # noqa: F401
+        pdf.register_fonts()
+        pre_migrate.connect(
+            deduplication.merge_duplicate_ingredients, sender=self)
+        post_migrate.connect(fulltext.install, sender=self)
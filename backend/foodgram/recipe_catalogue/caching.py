@@ -0,0 +1,103 @@
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+from . import models
+
+VERSION_KEY = 'reference:{model}:version'
+RESPONSE_KEY = 'reference:{model}:{version}:{path}'
+TAG_IDS_KEY = 'reference:tag_ids:{version}'
+
+
+def get_cache():
+    return caches[settings.REFERENCE_CACHE]
+
+
+def get_version(model):
+    """
+    Метод получения версии данных модели и времени ее изменения.
+    ETag вычисляется по самим данным, поэтому совпадает во всех
+    процессах. Версия живет не дольше REFERENCE_CACHE_TIMEOUT секунд,
+    чтобы при локальном кэше процессы подхватывали изменения других.
+    """
+    cache = get_cache()
+    key = VERSION_KEY.format(model=model._meta.label_lower)
+    version = cache.get(key)
+    if version is None:
+        version = {'etag': data_etag(model), 'modified': int(time.time())}
+        cache.set(key, version, settings.REFERENCE_CACHE_TIMEOUT)
+    return version
+
+
+def data_etag(model):
+    """Метод вычисления хэша всех строк таблицы модели."""
+    digest = hashlib.sha256()
+    for row in model.objects.order_by('pk').values_list().iterator():
+        digest.update(repr(row).encode())
+    return digest.hexdigest()
+
+
+def invalidate_version(sender, **kwargs):
+    """
+    Метод сброса версии данных модели при их изменении. Версия
+    сбрасывается после фиксации транзакции, чтобы ее не вычислили
+    заново по еще не сохраненным данным.
+    """
+    key = VERSION_KEY.format(model=sender._meta.label_lower)
+    transaction.on_commit(partial(get_cache().delete, key))
+
+
+def get_tag_ids():
+    """Метод получения словаря идентификаторов тегов по их slug."""
+    cache = get_cache()
+    key = TAG_IDS_KEY.format(version=get_version(models.Tag)['etag'])
+    tag_ids = cache.get(key)
+    if tag_ids is None:
+        tag_ids = dict(models.Tag.objects.values_list('slug', 'id'))
+        cache.set(key, tag_ids, settings.REFERENCE_CACHE_TIMEOUT)
+    return tag_ids
+
+
+class CachedResponseMixin:
+    """
+    Класс-примесь кэширования ответов справочных эндпоинтов.
+    Ответ хранится в кэше в виде готового JSON и сопровождается
+    заголовками ETag и Last-Modified для ответа 304 Not Modified.
+    """
+
+    def cached_response(self, request, get_response):
+        """Метод получения ответа из кэша или его формирования."""
+        model = self.get_queryset().model
+        version = get_version(model)
+        etag = quote_etag(version['etag'])
+        response = get_conditional_response(
+            request, etag=etag, last_modified=version['modified'])
+        if response is None:
+            cache = get_cache()
+            key = RESPONSE_KEY.format(
+                model=model._meta.label_lower, version=version['etag'],
+                path=request.get_full_path())
+            content = cache.get(key)
+            if content is None:
+                content = JSONRenderer().render(get_response().data)
+                cache.set(key, content, settings.REFERENCE_CACHE_TIMEOUT)
+            response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(version['modified'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs))
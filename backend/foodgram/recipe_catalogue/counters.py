@@ -0,0 +1,68 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from users.models import User
+
+from . import models
+
+RECIPE_COUNTERS = {
+    models.Favorite: 'favorites_count',
+    models.ShoppingCart: 'carts_count',
+}
+
+
+def change_counter(queryset, field, delta):
+    """
+    Метод атомарного изменения счетчика через F-выражение,
+    не допускающий отрицательных значений.
+    """
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def recipe_added(sender, instance, created, **kwargs):
+    """Метод увеличения счетчика рецепта при добавлении в избранное/корзину."""
+    if created:
+        change_counter(
+            models.Recipe.objects.filter(id=instance.recipe_id),
+            RECIPE_COUNTERS[sender], 1)
+
+
+def recipe_removed(sender, instance, **kwargs):
+    """Метод уменьшения счетчика рецепта при удалении из избранного/корзины."""
+    change_counter(
+        models.Recipe.objects.filter(id=instance.recipe_id),
+        RECIPE_COUNTERS[sender], -1)
+
+
+def recipe_created(sender, instance, created, **kwargs):
+    """Метод увеличения количества рецептов автора."""
+    if created:
+        change_counter(
+            User.objects.filter(id=instance.author_id), 'recipes_count', 1)
+
+
+def recipe_deleted(sender, instance, **kwargs):
+    """Метод уменьшения количества рецептов автора."""
+    change_counter(
+        User.objects.filter(id=instance.author_id), 'recipes_count', -1)
+
+
+def count_subquery(model, field):
+    """Метод подзапроса количества связанных строк модели."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field).annotate(total=Count('id')).values('total')), Value(0))
+
+
+def recompute_recipe_counters(queryset):
+    """Метод пересчета счетчиков избранного и корзины покупок рецептов."""
+    return queryset.update(**{
+        field: count_subquery(model, 'recipe')
+        for model, field in RECIPE_COUNTERS.items()})
+
+
+def recompute_user_counters(queryset):
+    """Метод пересчета количества рецептов пользователей."""
+    return queryset.update(
+        recipes_count=count_subquery(models.Recipe, 'author'))
@@ -0,0 +1,62 @@
+from django.db import connections, transaction
+from django.db.models import Count, Min
+
+from . import models
+
+MAX_AMOUNT = 32767
+
+
+def merge_duplicate_ingredients(using='default', **kwargs):
+    """
+    Метод слияния ингредиентов с одинаковыми названием и единицей
+    измерения перед миграциями, чтобы ограничение unique_ingredient
+    создалось на уже заполненной таблице. Связи с рецептами переносятся
+    на ингредиент с наименьшим id, количества в одном рецепте
+    складываются. Запросы используют только исходные колонки таблиц,
+    поэтому выполняются до применения новых миграций.
+    """
+    connection = connections[using]
+    if models.Ingredient._meta.db_table not in (
+            connection.introspection.table_names()):
+        return
+    ingredients = models.Ingredient.objects.using(using)
+    groups = ingredients.values('name', 'measurement_unit').annotate(
+        keep=Min('id'), total=Count('id')).filter(total__gt=1).order_by()
+    with transaction.atomic(using=using):
+        for group in list(groups):
+            duplicates = list(ingredients.filter(
+                name=group['name'],
+                measurement_unit=group['measurement_unit']).exclude(
+                id=group['keep']).values_list('id', flat=True))
+            merge_ingredient(connection, group['keep'], duplicates)
+
+
+def merge_ingredient(connection, keep, duplicates):
+    """Метод переноса связей ингредиентов duplicates на ингредиент keep."""
+    links = models.RecipeIngredient.objects.using(connection.alias)
+    merged = {}
+    for link_id, recipe_id, amount in links.filter(
+            ingredient_id__in=(keep, *duplicates),
+            recipe_id__isnull=False).order_by('id').values_list(
+            'id', 'recipe_id', 'amount'):
+        merged.setdefault(recipe_id, []).append((link_id, amount))
+    for recipe_links in merged.values():
+        if len(recipe_links) > 1:
+            (link_id, _), *extra = recipe_links
+            links.filter(id=link_id).update(amount=min(
+                sum(amount for _, amount in recipe_links), MAX_AMOUNT))
+            delete_rows(
+                connection, models.RecipeIngredient, [pk for pk, _ in extra])
+    links.filter(ingredient_id__in=duplicates).update(ingredient_id=keep)
+    delete_rows(connection, models.Ingredient, duplicates)
+
+
+def delete_rows(connection, model, ids):
+    """
+    Метод удаления строк по id без загрузки объектов, которым
+    нужны колонки из еще не примененных миграций.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {model._meta.db_table} '
+            f'WHERE id IN ({", ".join(["%s"] * len(ids))})', ids)
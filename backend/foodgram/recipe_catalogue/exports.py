@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Sum
+
+from . import models, pdf
+
+EXPORT_DIR = 'shopping_lists'
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+JOB_KEY = 'shopping_list_export:{version}'
+
+logger = logging.getLogger('foodgram.exports')
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.SHOPPING_LIST_EXPORT_WORKERS,
+    thread_name_prefix='shopping-list-export')
+
+
+def get_cache():
+    return caches[settings.SHOPPING_LIST_EXPORT_CACHE]
+
+
+def job_key(version):
+    return JOB_KEY.format(version=version)
+
+
+def cart_ingredients(user):
+    """Метод получения суммарного количества ингредиентов из корзины."""
+    return list(models.RecipeIngredient.objects.filter(
+        recipe__shoppingcarts__user=user).values(
+        'ingredient', 'ingredient__name',
+        'ingredient__measurement_unit').annotate(
+        total=Sum('amount')).order_by('ingredient__name'))
+
+
+def cart_version(ingredients):
+    """
+    Метод вычисления версии корзины покупок. Версия меняется при любом
+    изменении состава корзины или ингредиентов входящих в нее рецептов.
+    """
+    content = json.dumps(ingredients, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def artifact_name(version):
+    """Метод получения имени файла списка покупок в MEDIA_ROOT."""
+    return f'{EXPORT_DIR}/{version}.pdf'
+
+
+def artifact_path(version):
+    return os.path.join(settings.MEDIA_ROOT, artifact_name(version))
+
+
+def artifact_url(version):
+    return settings.MEDIA_URL + artifact_name(version)
+
+
+def render(version, ingredients):
+    """
+    Метод формирования PDF файла списка покупок. Готовый файл
+    переиспользуется, пока не изменится версия корзины, и при каждом
+    использовании отмечается свежим для clean_shopping_lists.
+    """
+    path = artifact_path(version)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as file:
+            pdf.pfd_table(file, ingredients)
+        os.replace(tmp_path, path)
+    return path
+
+
+def submit(version, ingredients):
+    """
+    Метод постановки формирования списка покупок в очередь. Статус
+    задачи хранится в кэше, поэтому повторный запрос к другому
+    процессу не ставит ту же задачу второй раз.
+    """
+    if os.path.exists(artifact_path(version)):
+        return
+    cache = get_cache()
+    key = job_key(version)
+    if not cache.add(
+            key, PENDING, settings.SHOPPING_LIST_EXPORT_JOB_TIMEOUT):
+        if cache.get(key) != FAILED:
+            return
+        cache.set(key, PENDING, settings.SHOPPING_LIST_EXPORT_JOB_TIMEOUT)
+    executor.submit(run, version, ingredients)
+
+
+def run(version, ingredients):
+    """
+    Метод выполнения задачи формирования списка покупок. Ошибка
+    хранится в кэше SHOPPING_LIST_EXPORT_FAILED_TIMEOUT секунд,
+    после чего задачу можно поставить заново.
+    """
+    try:
+        render(version, ingredients)
+    except Exception:
+        logger.exception('Не удалось сформировать список покупок %s.',
+                         version)
+        get_cache().set(
+            job_key(version), FAILED,
+            settings.SHOPPING_LIST_EXPORT_FAILED_TIMEOUT)
+    else:
+        get_cache().delete(job_key(version))
+
+
+def status(version):
+    """Метод получения статуса формирования списка покупок."""
+    if os.path.exists(artifact_path(version)):
+        return DONE
+    return get_cache().get(job_key(version))
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import connection
+from users.models import Subscription
+
+from . import models
+
+
+def feed_ids(user, authors, before, limit):
+    """
+    Метод получения id не более limit новейших рецептов авторов, на
+    которых подписан пользователь, с id меньше before.
+    """
+    if len(authors) <= settings.FEED_MERGE_THRESHOLD:
+        queryset = models.Recipe.objects.filter(author_id__in=authors)
+        if before is not None:
+            queryset = queryset.filter(id__lt=before)
+        return list(queryset.order_by('-id').values_list(
+            'id', flat=True)[:limit])
+    if connection.vendor == 'postgresql':
+        return merge_lateral(authors, before, limit)
+    return merge_window(user, before, limit)
+
+
+def merge_lateral(authors, before, limit):
+    """
+    Метод слияния курсоров по рецептам каждого автора. Для каждого
+    автора читается не более limit строк индекса (author, -id),
+    поэтому время не зависит от числа рецептов авторов.
+    """
+    table = models.Recipe._meta.db_table
+    bound = 'AND id < %s' if before is not None else ''
+    params = [list(authors)]
+    if before is not None:
+        params.append(before)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT recipe.id FROM unnest(%s::integer[]) AS author(id) '
+            f'CROSS JOIN LATERAL (SELECT id FROM {table} '
+            f'WHERE author_id = author.id {bound} '
+            f'ORDER BY id DESC LIMIT %s) AS recipe '
+            f'ORDER BY recipe.id DESC LIMIT %s', (*params, limit, limit))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def merge_window(user, before, limit):
+    """
+    Метод слияния для баз без LATERAL: от каждого автора берется
+    не более limit рецептов оконной функцией, затем общий срез.
+    """
+    queryset = models.Recipe.objects.filter(
+        author__in=Subscription.objects.filter(user=user).values('author'))
+    if before is not None:
+        queryset = queryset.filter(id__lt=before)
+    return list(queryset.latest_per_author(limit).order_by(
+        '-id').values_list('id', flat=True)[:limit])
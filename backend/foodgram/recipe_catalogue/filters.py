@@ -1,35 +1,74 @@
+from django.db.models import F
 from django_filters.rest_framework import FilterSet, filters
-from rest_framework.filters import SearchFilter
 from users.models import User
 
-from .models import Recipe
+from .caching import get_tag_ids
+from .fulltext import search_recipes
+from .models import Recipe, RecipeTag
 
-
-class IngredientFilter(SearchFilter):
-    """Класс для поиска ингредиентов по названию."""
-    search_param = 'name'
+ORDERING_CHOICES = (
+    ('popular', 'Популярные'),
+    ('trending', 'Популярные за последнее время'),
+    ('cooking_time', 'Быстрые в приготовлении'),
+)
 
 
 class RecipeFilter(FilterSet):
     """Класс-фильтр выдачи по рецептам."""
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = filters.CharFilter(method='filter_tags')
     author = filters.ModelChoiceFilter(queryset=User.objects.all())
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart')
+    search = filters.CharFilter(method='filter_search')
+    ordering = filters.ChoiceFilter(
+        choices=ORDERING_CHOICES, method='filter_ordering')
+
+    def filter_tags(self, queryset, name, value):
+        """
+        Метод фильтрации по тегам. Идентификаторы тегов берутся из кэша,
+        а подзапрос по таблице связи не дублирует рецепты.
+        """
+        tag_ids = get_tag_ids()
+        ids = [
+            tag_ids[slug] for slug in self.request.query_params.getlist(name)
+            if slug in tag_ids]
+        return queryset.filter(id__in=RecipeTag.objects.filter(
+            tag_id__in=ids).values('recipe_id'))
 
     def filter_is_favorited(self, queryset, name, value):
         """Метод фильтрации по избранным рецептам."""
         if self.request.user.is_authenticated and value:
-            return queryset.filter(favorites__user=self.request.user)
+            return queryset.filter(
+                favorites__user=self.request.user)
         return queryset
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         """Метод фильтрации по рецептам из корзины покупок."""
         if self.request.user.is_authenticated and value:
-            return queryset.filter(shoppingcarts__user=self.request.user)
+            return queryset.filter(
+                shoppingcarts__user=self.request.user)
         return queryset
 
+    def filter_search(self, queryset, name, value):
+        """Метод полнотекстового поиска по названию и описанию рецептов."""
+        return search_recipes(queryset, value)
+
+    def filter_ordering(self, queryset, name, value):
+        """
+        Метод сортировки рецептов. Популярность берется из счетчика
+        избранного, а трендовость из предрассчитанных оценок,
+        поэтому сортировка идет по индексу. Оценка есть у каждого
+        рецепта: она создается вместе с рецептом, а для рецептов,
+        добавленных в обход сигналов, — командой update_scores.
+        """
+        if value == 'popular':
+            return queryset.order_by('-favorites_count', '-id')
+        if value == 'trending':
+            return queryset.filter(score__isnull=False).annotate(
+                trending=F('score__trending')).order_by('-trending', '-id')
+        return queryset.order_by('cooking_time', 'id')
+
     class Meta:
         model = Recipe
         fields = ('tags', 'author')
@@ -0,0 +1,100 @@
+import re
+
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from . import models
+
+SEARCH_CONFIG = 'russian'
+SEARCH_TABLE = 'recipe_catalogue_recipe_search'
+
+# Колонка tsvector вычисляется самим PostgreSQL (12+) при записи
+# рецепта, поэтому не требует поддержки ни триггерами, ни сигналами.
+POSTGRESQL_SCHEMA = (
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('{config}', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('{config}', coalesce(text, '')), 'B')) STORED",
+    'CREATE INDEX IF NOT EXISTS recipe_search_vector_idx '
+    'ON {table} USING gin (search_vector)',
+)
+SQLITE_SCHEMA = (
+    "CREATE VIRTUAL TABLE {search} USING fts5("
+    "name, text, content='{table}', content_rowid='id')",
+    'CREATE TRIGGER {search}_insert AFTER INSERT ON {table} BEGIN '
+    'INSERT INTO {search} (rowid, name, text) '
+    'VALUES (new.id, new.name, new.text); END',
+    'CREATE TRIGGER {search}_delete AFTER DELETE ON {table} BEGIN '
+    "INSERT INTO {search} ({search}, rowid, name, text) "
+    "VALUES ('delete', old.id, old.name, old.text); END",
+    'CREATE TRIGGER {search}_update AFTER UPDATE ON {table} BEGIN '
+    "INSERT INTO {search} ({search}, rowid, name, text) "
+    "VALUES ('delete', old.id, old.name, old.text); "
+    'INSERT INTO {search} (rowid, name, text) '
+    'VALUES (new.id, new.name, new.text); END',
+    "INSERT INTO {search} ({search}) VALUES ('rebuild')",
+)
+# Колонка rank таблицы FTS5 вычисляется этой функцией. Совпадения
+# в названии весят больше, как и вес A у названия в PostgreSQL.
+SQLITE_RANK = (
+    "INSERT INTO {search} ({search}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+
+
+def install(using='default', **kwargs):
+    """
+    Метод создания полнотекстового индекса рецептов после миграций.
+    Для PostgreSQL это колонка tsvector с GIN индексом,
+    для SQLite — виртуальная таблица FTS5 с триггерами.
+    """
+    connection = connections[using]
+    table = models.Recipe._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            statements = POSTGRESQL_SCHEMA
+        elif connection.vendor == 'sqlite':
+            statements = (SQLITE_RANK, )
+            if SEARCH_TABLE not in connection.introspection.table_names(
+                    cursor):
+                statements = SQLITE_SCHEMA + statements
+        else:
+            return
+        for statement in statements:
+            cursor.execute(statement.format(
+                table=table, search=SEARCH_TABLE, config=SEARCH_CONFIG))
+
+
+def search_recipes(queryset, query):
+    """
+    Метод отбора рецептов по поисковому запросу с сортировкой
+    по релевантности. ts_rank возвращает float4, а курсор пагинации
+    хранит значение как float8, поэтому ранг приводится к float8,
+    иначе условие курсора не отсекает уже выданную страницу.
+    """
+    connection = connections[queryset.db]
+    table = models.Recipe._meta.db_table
+    if connection.vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.extra(
+            where=[f'{table}.search_vector @@ {tsquery}'],
+            params=(query, )).annotate(search_rank=RawSQL(
+                f'ts_rank({table}.search_vector, {tsquery})::float8',
+                (query, ),
+                output_field=FloatField())).order_by('-search_rank', '-id')
+    if connection.vendor == 'sqlite':
+        words = re.findall(r'\w+', query)
+        if not words:
+            return queryset.none()
+        match = ' '.join(f'"{word}"*' for word in words)
+        # rank тем меньше, чем релевантнее рецепт. Функцию bm25 напрямую
+        # использовать нельзя: SQLite не допускает ее в GROUP BY запроса
+        # количества, а колонку rank допускает.
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[
+                f'{SEARCH_TABLE}.rowid = {table}.id',
+                f'{SEARCH_TABLE} MATCH %s'],
+            params=(match, )).annotate(search_rank=RawSQL(
+                f'-{SEARCH_TABLE}.rank', (),
+                output_field=FloatField())).order_by('-search_rank', '-id')
+    return queryset.filter(name__icontains=query)
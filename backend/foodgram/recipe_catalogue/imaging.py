@@ -0,0 +1,122 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image, ImageOps, features
+from rest_framework import serializers
+
+from . import models
+
+VARIANTS = {
+    'thumbnail': (160, 160),
+    'card': (480, 480),
+    'full': (1280, 1280),
+}
+VARIANTS_DIR = 'variants'
+FORMAT, EXTENSION = ('WEBP', 'webp') if features.check('webp') else (
+    'JPEG', 'jpg')
+
+logger = logging.getLogger('foodgram.imaging')
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.RECIPE_IMAGE_WORKERS,
+    thread_name_prefix='recipe-image')
+
+
+class RecipeImageField(Base64ImageField):
+    """
+    Класс поля картинки рецепта. Проверяет размер данных до
+    декодирования и размер картинки в пикселях до ее загрузки.
+    """
+
+    def to_internal_value(self, base64_data):
+        if isinstance(base64_data, str) and (
+                len(base64_data) * 3 // 4
+                > settings.RECIPE_IMAGE_MAX_UPLOAD_SIZE):
+            raise serializers.ValidationError(
+                'Размер картинки не должен превышать '
+                f'{settings.RECIPE_IMAGE_MAX_UPLOAD_SIZE} байт.')
+        file = super().to_internal_value(base64_data)
+        if file is not None:
+            width, height = file.image.size
+            if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+                raise serializers.ValidationError(
+                    'Разрешение картинки слишком велико.')
+        return file
+
+
+def variant_name(name, variant):
+    """Метод получения имени файла уменьшенной копии картинки."""
+    directory, filename = os.path.split(name)
+    root = os.path.splitext(filename)[0]
+    return os.path.join(
+        directory, VARIANTS_DIR, f'{root}_{variant}.{EXTENSION}')
+
+
+def render_variants(name):
+    """Метод формирования уменьшенных копий картинки."""
+    with default_storage.open(name) as file, Image.open(file) as image:
+        image.draft('RGB', VARIANTS['full'])
+        image = ImageOps.exif_transpose(image)
+        if FORMAT == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGB' if FORMAT == 'JPEG' else 'RGBA')
+        for variant, size in VARIANTS.items():
+            copy = image.copy()
+            copy.thumbnail(size)
+            buffer = BytesIO()
+            copy.save(buffer, FORMAT, quality=80)
+            path = variant_name(name, variant)
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            default_storage.save(path, ContentFile(buffer.getvalue()))
+
+
+def process_image(name):
+    """
+    Метод формирования недостающих уменьшенных копий картинки
+    и отметки о них у всех рецептов с этой картинкой. Выполняется
+    в фоновом потоке, поэтому ошибки только записываются в лог.
+    """
+    try:
+        if not all(
+                default_storage.exists(variant_name(name, variant))
+                for variant in VARIANTS):
+            render_variants(name)
+        models.Recipe.objects.filter(image=name).update(image_variants=True)
+    except Exception:
+        logger.exception('Не удалось сформировать копии картинки %s.', name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(image):
+    """
+    Метод постановки формирования уменьшенных копий картинки
+    в очередь после фиксации транзакции. Картинки называются по хэшу
+    содержимого, поэтому готовые копии не формируются повторно.
+    """
+    if image:
+        name = image.name
+        transaction.on_commit(lambda: executor.submit(process_image, name))
+
+
+def variant_urls(image, ready, request=None):
+    """
+    Метод получения ссылок на уменьшенные копии картинки. Пока копии
+    не готовы (ready из Recipe.image_variants), вместо них отдается
+    ссылка на исходную картинку.
+    """
+    if not image:
+        return None
+    urls = {}
+    for variant in VARIANTS:
+        url = (default_storage.url(variant_name(image.name, variant))
+               if ready else image.url)
+        urls[variant] = request.build_absolute_uri(url) if request else url
+    return urls
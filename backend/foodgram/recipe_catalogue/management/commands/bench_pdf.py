@@ -0,0 +1,34 @@
+import json
+import timeit
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from recipe_catalogue import pdf
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер времени формирования PDF списка покупок для разного '
+        'числа строк. Для каждого размера берется лучший из нескольких '
+        'повторов. Результат выводится в формате JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, action='append',
+            help='Число строк в списке, по умолчанию 10, 50 и 200.')
+        parser.add_argument('--number', type=int, default=30)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        report = {}
+        for size in options['rows'] or (10, 50, 200):
+            ingredients = [
+                {'ingredient__name': f'ингредиент {num}',
+                 'ingredient__measurement_unit': 'г', 'total': num}
+                for num in range(size)]
+            best = min(timeit.repeat(
+                lambda: pdf.pfd_table(BytesIO(), ingredients),
+                number=options['number'], repeat=options['repeat']))
+            report[size] = round(best / options['number'] * 1000, 3)
+        self.stdout.write(json.dumps(
+            {'ms_per_document': report}, ensure_ascii=False, indent=2))
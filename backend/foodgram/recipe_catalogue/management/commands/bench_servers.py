@@ -0,0 +1,211 @@
+import base64
+import json
+import shutil
+import subprocess
+import threading
+import time
+from datetime import datetime
+from io import BytesIO
+from itertools import count, repeat
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+from recipe_catalogue.models import Recipe
+from users.models import User
+
+from .run_bench import ENDPOINTS
+from .run_bench import Command as RunBench
+from .run_bench import fetch, http_request
+from .seed_bench import PREFIX
+
+SERVERS = {
+    'wsgi': ('foodgram.wsgi:application', ),
+    'asgi': (
+        'foodgram.asgi:application',
+        '--worker-class', 'uvicorn.workers.UvicornWorker'),
+}
+STARTUP_TIMEOUT = 30
+UPLOAD = 'recipe_image_upload'
+IMAGE_SIZE = (1600, 1200)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение пропускной способности WSGI и ASGI приложений на данных '
+        'seed_bench. Оба приложения по очереди запускаются gunicorn '
+        'с одинаковым числом процессов, эндпоинты нагружаются параллельными '
+        'запросами на фоне медленных запросов. Результат выводится '
+        'в формате JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--port', type=int, default=8100)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--endpoint', action='append', choices=ENDPOINTS,
+            help='Тестировать только указанные эндпоинты.')
+        parser.add_argument(
+            '--background', type=int, default=4,
+            help='Сколько клиентов параллельно выполняют медленные запросы.')
+        parser.add_argument(
+            '--background-endpoint', choices=(UPLOAD, *ENDPOINTS),
+            default=UPLOAD,
+            help=f'{UPLOAD} — замена картинки рецепта пользователя новой: '
+                 'декодирование, сохранение и формирование уменьшенных '
+                 'копий. Ответы остальных эндпоинтов могут кэшироваться '
+                 'и перестать быть медленными.')
+        parser.add_argument('--output', help='Файл для записи результата.')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=f'{PREFIX}0@foodgram.ru').first()
+        if user is None:
+            raise CommandError('Сначала выполните manage.py seed_bench.')
+        self.recipe = Recipe.objects.filter(author=user).order_by('id').first()
+        if options['background_endpoint'] == UPLOAD and self.recipe is None:
+            raise CommandError('У пользователя нет рецептов для загрузки.')
+        endpoints = options['endpoint'] or [
+            'tags', 'recipes', 'users', 'ingredients_search']
+        report = {
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'workers': options['workers'],
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'background': options['background'],
+            'background_endpoint': options['background_endpoint'],
+            'servers': {
+                server: self.run_server(server, user, endpoints, options)
+                for server in SERVERS},
+        }
+        report['asgi_speedup'] = {
+            name: round(
+                report['servers']['asgi'][name]['throughput_rps']
+                / report['servers']['wsgi'][name]['throughput_rps'], 2)
+            for name in endpoints}
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def run_server(self, server, user, endpoints, options):
+        """Метод запуска сервера и замера эндпоинтов на нем."""
+        gunicorn = shutil.which('gunicorn')
+        if gunicorn is None:
+            raise CommandError('Не установлен gunicorn.')
+        address = f'127.0.0.1:{options["port"]}'
+        base_url = f'http://{address}'
+        process = subprocess.Popen(
+            [gunicorn, *SERVERS[server],
+             '--workers', str(options['workers']), '--bind', address],
+            cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL)
+        try:
+            self.wait_for_server(process, base_url)
+            stop = threading.Event()
+            stats = [
+                {'requests': 0, 'errors': 0, 'last_error': None}
+                for _ in range(options['background'])]
+            threads = [
+                threading.Thread(target=self.load, args=(
+                    self.background_requests(user, base_url, options, num),
+                    stop, stats[num]))
+                for num in range(options['background'])]
+            for thread in threads:
+                thread.start()
+            try:
+                bench = RunBench(stdout=self.stdout)
+                result = {
+                    name: bench.run_http(
+                        user, ENDPOINTS[name], {**options, 'url': base_url})
+                    for name in endpoints}
+            finally:
+                stop.set()
+                for thread in threads:
+                    thread.join()
+            result['background'] = self.summarize_background(server, stats)
+            return result
+        finally:
+            process.terminate()
+            process.wait()
+
+    def wait_for_server(self, process, base_url):
+        """Метод ожидания готовности сервера принимать запросы."""
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError('Сервер завершился при запуске.')
+            try:
+                with urlopen(f'{base_url}/api/tags/'):
+                    return
+            except (ConnectionError, URLError):
+                time.sleep(0.2)
+        raise CommandError('Сервер не запустился.')
+
+    def background_requests(self, user, base_url, options, client):
+        """
+        Метод получения бесконечной последовательности запросов фоновой
+        нагрузки для клиента с номером client. Картинки всех клиентов
+        залиты разными цветами, поэтому каждая загрузка обрабатывается
+        заново, а не находится среди уже сохраненных.
+        """
+        name = options['background_endpoint']
+        if name != UPLOAD:
+            return repeat(http_request(user, base_url, ENDPOINTS[name]))
+        request = http_request(
+            user, base_url, f'/api/recipes/{self.recipe.id}/')
+        return (
+            upload_request(request, color)
+            for color in count(client, options['background']))
+
+    def load(self, requests, stop, stats):
+        """
+        Метод фоновой нагрузки медленными запросами. Исключения
+        не останавливают поток, а считаются ошибками вместе
+        с ответами с кодом ошибки.
+        """
+        while not stop.is_set():
+            try:
+                _, failed = fetch(next(requests))
+            except Exception as error:
+                failed = True
+                stats['last_error'] = repr(error)
+            stats['requests'] += 1
+            stats['errors'] += failed
+
+    def summarize_background(self, server, stats):
+        """
+        Метод подсчета статистики фоновой нагрузки. При ошибках
+        выводится предупреждение: сравнение серверов без фоновой
+        нагрузки не показательно.
+        """
+        result = {
+            'requests': sum(item['requests'] for item in stats),
+            'errors': sum(item['errors'] for item in stats),
+        }
+        if result['errors']:
+            last_error = next(
+                (item['last_error'] for item in stats
+                 if item['last_error']), None)
+            self.stderr.write(
+                f'{server}: {result["errors"]} из {result["requests"]} '
+                'фоновых запросов завершились ошибкой'
+                + (f', последняя: {last_error}.' if last_error else '.'))
+        return result
+
+
+def upload_request(request, color):
+    """
+    Метод получения запроса замены картинки рецепта картинкой
+    размера IMAGE_SIZE, залитой цветом color.
+    """
+    buffer = BytesIO()
+    Image.new('RGB', IMAGE_SIZE, color % 0x1000000).save(buffer, 'PNG')
+    image = base64.b64encode(buffer.getvalue()).decode()
+    return Request(
+        request.full_url, method='PATCH',
+        data=json.dumps({'image': f'data:image/png;base64,{image}'}).encode(),
+        headers={**request.headers, 'Content-Type': 'application/json'})
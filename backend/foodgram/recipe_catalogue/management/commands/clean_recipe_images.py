@@ -0,0 +1,70 @@
+import os
+import time
+from itertools import chain
+
+from django.core.management.base import BaseCommand
+from recipe_catalogue.imaging import VARIANTS_DIR
+from recipe_catalogue.models import Recipe
+from recipe_catalogue.storage import recipe_image_storage
+
+UPLOAD_DIR = 'recipe'
+GRACE_PERIOD = 60 * 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаление картинок рецептов и их уменьшенных копий, '
+        'на которые не ссылается ни один рецепт.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только вывести файлы, которые будут удалены.')
+        parser.add_argument(
+            '--grace-period', type=int, default=GRACE_PERIOD,
+            help='Не удалять файлы моложе указанного числа секунд.')
+
+    def handle(self, *args, **options):
+        referenced = {
+            os.path.splitext(os.path.basename(name))[0]
+            for name in Recipe.objects.exclude(image='').values_list(
+                'image', flat=True).iterator()}
+        deadline = time.time() - options['grace_period']
+        directory = recipe_image_storage.path(UPLOAD_DIR)
+        removed = freed = 0
+        for path, is_variant in chain(
+                self.scan(directory, False),
+                self.scan(os.path.join(directory, VARIANTS_DIR), True)):
+            root = os.path.splitext(os.path.basename(path))[0]
+            if is_variant:
+                root = root.rsplit('_', 1)[0]
+            if root in referenced or self.is_referenced(root):
+                continue
+            stat = os.stat(path)
+            if stat.st_mtime > deadline:
+                continue
+            self.stdout.write(path)
+            if not options['dry_run']:
+                os.remove(path)
+            removed += 1
+            freed += stat.st_size
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено файлов: {removed}, освобождено байт: {freed}.'))
+
+    def is_referenced(self, root):
+        """
+        Метод повторной проверки ссылок на картинку прямо перед
+        удалением: за время обхода ее могли загрузить снова. Время
+        изменения файла проверяется уже после этого запроса.
+        """
+        return Recipe.objects.filter(
+            image__startswith=f'{UPLOAD_DIR}/{root}.').exists()
+
+    def scan(self, directory, is_variant):
+        """Метод обхода файлов каталога без загрузки списка в память."""
+        if not os.path.isdir(directory):
+            return
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry.path, is_variant
@@ -0,0 +1,45 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from recipe_catalogue.exports import EXPORT_DIR
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаление PDF файлов списков покупок, которые не скачивали '
+        'дольше указанного времени.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только вывести файлы, которые будут удалены.')
+        parser.add_argument(
+            '--max-age', type=int, default=settings.SHOPPING_LIST_MAX_AGE,
+            help='Удалять файлы старше указанного числа секунд.')
+
+    def handle(self, *args, **options):
+        deadline = time.time() - options['max_age']
+        directory = os.path.join(settings.MEDIA_ROOT, EXPORT_DIR)
+        removed = freed = 0
+        for path in self.scan(directory):
+            stat = os.stat(path)
+            if stat.st_mtime > deadline:
+                continue
+            self.stdout.write(path)
+            if not options['dry_run']:
+                os.remove(path)
+            removed += 1
+            freed += stat.st_size
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено файлов: {removed}, освобождено байт: {freed}.'))
+
+    def scan(self, directory):
+        """Метод обхода файлов каталога без загрузки списка в память."""
+        if not os.path.isdir(directory):
+            return
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry.path
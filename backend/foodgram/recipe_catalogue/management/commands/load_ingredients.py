@@ -0,0 +1,183 @@
+import csv
+import io
+import json
+import os
+import re
+import time
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from recipe_catalogue.models import Ingredient
+
+FIELDS = ('name', 'measurement_unit', )
+BATCH_SIZE = 5000
+CHUNK_SIZE = 64 * 1024
+STAGING_TABLE = 'ingredient_staging'
+WHITESPACE = re.compile(r'\s*')
+
+
+def read_csv(file):
+    """Метод построчного чтения ингредиентов из CSV файла."""
+    reader = csv.reader(file)
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < len(FIELDS):
+            raise CommandError(
+                f'Строка {reader.line_num}: ожидаются название '
+                f'и единица измерения.')
+        yield row[0], row[1]
+
+
+def iter_json_array(file):
+    """
+    Метод потокового чтения элементов JSON массива. Файл читается
+    частями, и в памяти находится только текущий элемент.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, separators = '', 0, '['
+    for chunk in iter(partial(file.read, CHUNK_SIZE), ''):
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            position = WHITESPACE.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if separators == '[' and char != '[':
+                raise CommandError('JSON файл должен содержать массив.')
+            if char in separators:
+                separators = ','
+                position += 1
+                continue
+            if char == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            yield item
+    raise CommandError('JSON файл оборван или содержит ошибку.')
+
+
+def read_json(file):
+    """Метод потокового чтения ингредиентов из JSON файла."""
+    for number, item in enumerate(iter_json_array(file), 1):
+        if not isinstance(item, dict) or not set(FIELDS) <= item.keys():
+            raise CommandError(
+                f'Элемент {number}: ожидаются поля name и measurement_unit.')
+        yield item['name'], item['measurement_unit']
+
+
+READERS = {'.csv': read_csv, '.json': read_json}
+
+
+class RowsFile:
+    """
+    Класс файлоподобного объекта для COPY, который формирует CSV
+    по мере чтения, не загружая весь файл в память. Ошибка разбора
+    файла сохраняется, так как драйвер заменяет ее своей.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.total = 0
+        self.error = None
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.pending = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.pending) < size:
+            try:
+                row = next(self.rows, None)
+            except CommandError as error:
+                self.error = error
+                raise
+            if row is None:
+                break
+            self.writer.writerow(row)
+            self.total += 1
+            self.pending += self.buffer.getvalue()
+            self.buffer.seek(0)
+            self.buffer.truncate()
+        if size < 0:
+            size = len(self.pending)
+        try:
+            return self.pending[:size]
+        finally:
+            self.pending = self.pending[size:]
+
+
+class Command(BaseCommand):
+    help = (
+        'Загрузка ингредиентов из CSV или JSON файла. Повторная загрузка '
+        'не создает дубликатов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?',
+            default=os.path.join(settings.BASE_DIR, 'ingredients.csv'),
+            help='Путь к CSV или JSON файлу с ингредиентами.')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Размер пачки при загрузке без COPY.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        reader = READERS.get(os.path.splitext(path)[1].lower())
+        if reader is None:
+            raise CommandError('Поддерживаются только CSV и JSON файлы.')
+        start = time.monotonic()
+        before = Ingredient.objects.count()
+        with open(path, encoding='utf-8') as file, transaction.atomic():
+            if connection.vendor == 'postgresql':
+                total = self.copy(reader(file))
+            else:
+                total = self.bulk_create(reader(file), options['batch_size'])
+        created = Ingredient.objects.count() - before
+        elapsed = max(time.monotonic() - start, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано строк: {total}, добавлено ингредиентов: {created} '
+            f'за {elapsed:.2f} с ({total / elapsed:.0f} строк/с).'))
+
+    def copy(self, rows):
+        """
+        Метод загрузки через COPY во временную таблицу и вставки
+        новых ингредиентов с пропуском уже существующих.
+        """
+        table = Ingredient._meta.db_table
+        file = RowsFile(rows)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE {STAGING_TABLE} '
+                f'(name varchar(255), measurement_unit varchar(255)) '
+                f'ON COMMIT DROP')
+            try:
+                cursor.cursor.copy_expert(
+                    f'COPY {STAGING_TABLE} ({", ".join(FIELDS)}) '
+                    f'FROM STDIN WITH (FORMAT csv)', file)
+            except connection.Database.Error:
+                if file.error is not None:
+                    raise file.error from None
+                raise
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(FIELDS)}) '
+                f'SELECT DISTINCT name, measurement_unit FROM {STAGING_TABLE} '
+                f'ON CONFLICT (name, measurement_unit) DO NOTHING')
+        return file.total
+
+    def bulk_create(self, rows, batch_size):
+        """Метод загрузки пачками через bulk_create."""
+        total = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return total
+            Ingredient.objects.bulk_create(
+                (Ingredient(name=name, measurement_unit=unit)
+                 for name, unit in batch), ignore_conflicts=True)
+            total += len(batch)
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipe_catalogue.counters import (recompute_recipe_counters,
+                                       recompute_user_counters)
+from recipe_catalogue.models import Recipe
+from users.models import User
+
+BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчет счетчиков избранного и корзины покупок рецептов '
+        'и количества рецептов пользователей.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество строк, обновляемых одним запросом.')
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        for model, recompute in (
+                (Recipe, recompute_recipe_counters),
+                (User, recompute_user_counters)):
+            updated = self.recompute(
+                model.objects.all(), recompute, options['batch_size'])
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Счетчики пересчитаны за {time.monotonic() - start:.2f} с.'))
+
+    def recompute(self, queryset, recompute, batch_size):
+        """
+        Метод пересчета по диапазонам первичного ключа, чтобы
+        не блокировать всю таблицу одной транзакцией.
+        """
+        updated = last_id = 0
+        while True:
+            ids = list(queryset.filter(id__gt=last_id).order_by(
+                'id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return updated
+            with transaction.atomic():
+                updated += recompute(queryset.filter(
+                    id__gte=ids[0], id__lte=ids[-1]))
+            last_id = ids[-1]
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from recipe_catalogue.imaging import process_image
+from recipe_catalogue.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        'Формирование уменьшенных копий картинок рецептов, у которых '
+        'они еще не отмечены готовыми, например после обновления.')
+
+    def handle(self, *args, **options):
+        names = Recipe.objects.filter(image_variants=False).exclude(
+            image='').values_list('image', flat=True).distinct().order_by()
+        total = 0
+        for name in names.iterator():
+            process_image(name)
+            total += 1
+        ready = Recipe.objects.filter(image_variants=True).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {total}, рецептов с копиями: {ready}.'))
@@ -0,0 +1,165 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.client import HTTPException
+from urllib.error import URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from recipe_catalogue.models import (Favorite, Recipe, RecipeIngredient,
+                                     ShoppingCart)
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import Subscription, User
+
+from .seed_bench import PREFIX
+
+ENDPOINTS = {
+    'recipes': '/api/recipes/',
+    'recipes_cursor': '/api/recipes/?cursor=',
+    'recipes_popular': '/api/recipes/?ordering=popular',
+    'recipes_trending': '/api/recipes/?ordering=trending',
+    'recipes_search': '/api/recipes/?search=соусом',
+    'feed': '/api/recipes/feed/',
+    'subscriptions': '/api/users/subscriptions/',
+    'users': '/api/users/',
+    'tags': '/api/tags/',
+    'ingredients_search': '/api/ingredients/?name=bench',
+    'download_shopping_cart': '/api/recipes/download_shopping_cart/',
+}
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, rank):
+    """Метод вычисления перцентиля методом ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * rank // 100) - 1)
+    return ordered[index]
+
+
+def http_request(user, base_url, url):
+    """Метод получения HTTP запроса к эндпоинту от имени пользователя."""
+    token, _ = Token.objects.get_or_create(user=user)
+    return Request(
+        base_url.rstrip('/') + quote(url, safe='/?=&'),
+        headers={'Authorization': f'Token {token.key}'})
+
+
+def fetch(request):
+    """
+    Метод выполнения HTTP запроса. Возвращает время и признак ошибки.
+    Ошибкой считается и ответ с кодом ошибки, и сбой соединения.
+    """
+    began = time.perf_counter()
+    try:
+        with urlopen(request) as response:
+            response.read()
+        failed = False
+    except (URLError, OSError, HTTPException):
+        failed = True
+    return time.perf_counter() - began, failed
+
+
+def summarize(latencies, elapsed, errors, queries=None):
+    """Метод подсчета статистики по замерам одного эндпоинта."""
+    result = {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+    }
+    for rank in PERCENTILES:
+        result[f'p{rank}_ms'] = round(
+            percentile(latencies, rank) * 1000, 3)
+    if queries is not None:
+        result['queries'] = max(queries)
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест основных эндпоинтов на данных seed_bench. '
+        'Результат выводится в формате JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode', choices=('inprocess', 'http'), default='inprocess',
+            help='inprocess — тестовый клиент Django в этом процессе, '
+                 'http — параллельные запросы к запущенному серверу.')
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000',
+            help='Адрес сервера для режима http.')
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--endpoint', action='append', choices=ENDPOINTS,
+            help='Тестировать только указанные эндпоинты.')
+        parser.add_argument('--output', help='Файл для записи результата.')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=f'{PREFIX}0@foodgram.ru').first()
+        if user is None:
+            raise CommandError('Сначала выполните manage.py seed_bench.')
+        endpoints = options['endpoint'] or list(ENDPOINTS)
+        run = (
+            self.run_inprocess if options['mode'] == 'inprocess'
+            else self.run_http)
+        report = {
+            'mode': options['mode'],
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'vendor': connection.vendor,
+            'requests': options['requests'],
+            'concurrency': (
+                options['concurrency'] if options['mode'] == 'http' else 1),
+            'rows': {
+                model._meta.db_table: model.objects.count()
+                for model in (User, Recipe, RecipeIngredient, Favorite,
+                              ShoppingCart, Subscription)},
+            'endpoints': {
+                name: run(user, ENDPOINTS[name], options)
+                for name in endpoints},
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def run_inprocess(self, user, url, options):
+        """
+        Метод замера эндпоинта тестовым клиентом Django.
+        Дополнительно считается количество SQL запросов.
+        """
+        client = APIClient()
+        client.force_authenticate(user)
+        for _ in range(options['warmup']):
+            client.get(url)
+        latencies, queries, errors = [], [], 0
+        start = time.perf_counter()
+        for _ in range(options['requests']):
+            with CaptureQueriesContext(connection) as captured:
+                began = time.perf_counter()
+                response = client.get(url)
+                latencies.append(time.perf_counter() - began)
+            queries.append(len(captured))
+            errors += response.status_code >= 400
+        return summarize(
+            latencies, time.perf_counter() - start, errors, queries)
+
+    def run_http(self, user, url, options):
+        """Метод замера эндпоинта параллельными HTTP запросами к серверу."""
+        request = http_request(user, options['url'], url)
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            list(executor.map(fetch, [request] * options['warmup']))
+            start = time.perf_counter()
+            results = list(executor.map(
+                fetch, [request] * options['requests']))
+        return summarize(
+            [latency for latency, _ in results],
+            time.perf_counter() - start,
+            sum(failed for _, failed in results))
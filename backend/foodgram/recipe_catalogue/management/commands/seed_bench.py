@@ -0,0 +1,152 @@
+import random
+import time
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipe_catalogue.models import (Favorite, Ingredient, Recipe,
+                                     RecipeIngredient, RecipeTag, ShoppingCart,
+                                     Tag)
+from rest_framework.authtoken.models import Token
+from users.models import Subscription, User
+
+PREFIX = 'bench'
+PASSWORD = 'bench-password'
+BATCH_SIZE = 5000
+WORDS = (
+    'нарезать', 'обжарить', 'добавить', 'посолить', 'перемешать', 'тушить',
+    'запечь', 'остудить', 'подавать', 'луком', 'морковью', 'сметаной',
+    'зеленью', 'сыром', 'маслом', 'минут', 'огне', 'духовке', 'соусом',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерация синтетических данных для нагрузочных тестов. '
+        'Одинаковые параметры и --seed дают одинаковые данные.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes-per-user', type=int, default=10)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--favorites-per-user', type=int, default=20)
+        parser.add_argument('--carts-per-user', type=int, default=5)
+        parser.add_argument('--subscriptions-per-user', type=int, default=20)
+        parser.add_argument(
+            '--ingredients', type=int, default=2000,
+            help='Сколько ингредиентов создать, если их нет в базе.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            self.stdout.write(self.style.WARNING(
+                'Данные для нагрузочных тестов уже созданы.'))
+            return
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        start = time.monotonic()
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            tags = self.create_tags()
+            ingredients = self.create_ingredients(options['ingredients'])
+            recipes = self.create_recipes(
+                users, options['recipes_per_user'])
+            self.insert(RecipeTag, (
+                RecipeTag(recipe_id=recipe_id, tag_id=tag_id)
+                for recipe_id in recipes
+                for tag_id in self.random.sample(
+                    tags, self.random.randint(1, len(tags)))))
+            self.insert(RecipeIngredient, (
+                RecipeIngredient(
+                    recipe_id=recipe_id, ingredient_id=ingredient_id,
+                    amount=self.random.randint(1, 500))
+                for recipe_id in recipes
+                for ingredient_id in self.random.sample(ingredients, min(
+                    options['ingredients_per_recipe'], len(ingredients)))))
+            for model, per_user in (
+                    (Favorite, options['favorites_per_user']),
+                    (ShoppingCart, options['carts_per_user'])):
+                self.insert(model, (
+                    model(user_id=user_id, recipe_id=recipe_id)
+                    for user_id in users
+                    for recipe_id in self.random.sample(
+                        recipes, min(per_user, len(recipes)))))
+            self.insert(Subscription, (
+                Subscription(user_id=user_id, author_id=author_id)
+                for user_id in users
+                for author_id in [
+                    author_id for author_id in self.random.sample(
+                        users, min(options['subscriptions_per_user'] + 1,
+                                   len(users)))
+                    if author_id != user_id][
+                        :options['subscriptions_per_user']]))
+            Token.objects.get_or_create(user_id=users[0])
+        call_command('recompute_counters', stdout=self.stdout)
+        call_command('update_scores', rebuild=True, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы за {time.monotonic() - start:.2f} с. '
+            f'Пользователь для тестов: {PREFIX}0@foodgram.ru, '
+            f'пароль: {PASSWORD}.'))
+
+    def insert(self, model, objects):
+        """Метод вставки объектов пачками по batch_size."""
+        total = 0
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch)
+            total += len(batch)
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {total}.')
+
+    def create_users(self, count):
+        """Метод создания пользователей с общим заранее вычисленным паролем."""
+        password = make_password(PASSWORD)
+        self.insert(User, (
+            User(email=f'{PREFIX}{num}@foodgram.ru', username=f'{PREFIX}{num}',
+                 first_name='Bench', last_name=str(num), password=password)
+            for num in range(count)))
+        return list(User.objects.filter(username__startswith=PREFIX).order_by(
+            'id').values_list('id', flat=True))
+
+    def create_tags(self):
+        """Метод получения тегов, при их отсутствии они создаются."""
+        tags = list(Tag.objects.order_by('id').values_list('id', flat=True))
+        if tags:
+            return tags
+        self.insert(Tag, (
+            Tag(name=name, slug=slug, color=color)
+            for name, slug, color in (
+                ('Завтрак', 'breakfast', '#E26C2D'),
+                ('Обед', 'lunch', '#49B64E'),
+                ('Ужин', 'dinner', '#8775D2'))))
+        return list(Tag.objects.order_by('id').values_list('id', flat=True))
+
+    def create_ingredients(self, count):
+        """Метод получения ингредиентов, при их отсутствии они создаются."""
+        ingredients = list(Ingredient.objects.order_by('id').values_list(
+            'id', flat=True))
+        if ingredients:
+            return ingredients
+        units = [unit for unit, _ in Ingredient.UNIT_CHOICES]
+        self.insert(Ingredient, (
+            Ingredient(name=f'{PREFIX} ingredient {num}',
+                       measurement_unit=units[num % len(units)])
+            for num in range(count)))
+        return list(Ingredient.objects.order_by('id').values_list(
+            'id', flat=True))
+
+    def create_recipes(self, users, per_user):
+        """Метод создания рецептов пользователей."""
+        self.insert(Recipe, (
+            Recipe(author_id=user_id, name=f'{PREFIX} recipe {num}',
+                   text=' '.join(self.random.choices(WORDS, k=30)),
+                   cooking_time=self.random.randint(1, 180),
+                   image='recipe/bench.png')
+            for user_id in users for num in range(per_user)))
+        return list(Recipe.objects.filter(
+            name__startswith=f'{PREFIX} recipe').order_by('id').values_list(
+                'id', flat=True))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from recipe_catalogue.scoring import update_scores
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновление оценок популярности рецептов по новым добавлениям '
+        'в избранное и корзину покупок. Рецептам, добавленным в обход '
+        'сигналов (bulk_create, seed_bench), создаются недостающие оценки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Пересчитать оценки заново с учетом удаленных событий.')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Повторять обновление с указанным интервалом в секундах.')
+
+    def handle(self, *args, **options):
+        rebuild = options['rebuild']
+        while True:
+            start = time.monotonic()
+            updated = update_scores(rebuild=rebuild)
+            self.stdout.write(self.style.SUCCESS(
+                f'Обновлено оценок: {updated} '
+                f'за {time.monotonic() - start:.2f} с.'))
+            if not options['interval']:
+                return
+            rebuild = False
+            time.sleep(options['interval'])
@@ -0,0 +1,60 @@
+from collections import namedtuple
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from users.models import Subscription
+
+from . import models
+
+MEMBERSHIP_KEY = 'membership:{user_id}'
+
+Membership = namedtuple(
+    'Membership', ('favorites', 'shopping_cart', 'subscriptions'))
+EMPTY = Membership(frozenset(), frozenset(), frozenset())
+
+
+def get_cache():
+    return caches[settings.REFERENCE_CACHE]
+
+
+def load_membership(user):
+    """
+    Метод загрузки идентификаторов избранных рецептов, рецептов
+    из корзины покупок и авторов, на которых подписан пользователь.
+    """
+    key = MEMBERSHIP_KEY.format(user_id=user.id)
+    membership = get_cache().get(key)
+    if membership is None:
+        membership = Membership(
+            frozenset(models.Favorite.objects.filter(
+                user=user).values_list('recipe_id', flat=True)),
+            frozenset(models.ShoppingCart.objects.filter(
+                user=user).values_list('recipe_id', flat=True)),
+            frozenset(Subscription.objects.filter(
+                user=user).values_list('author_id', flat=True)))
+        get_cache().set(key, membership, settings.MEMBERSHIP_CACHE_TIMEOUT)
+    return membership
+
+
+def get_membership(request):
+    """
+    Метод получения принадлежностей текущего пользователя.
+    Загружаются один раз за запрос.
+    """
+    if request is None or not request.user.is_authenticated:
+        return EMPTY
+    if getattr(request, 'membership', None) is None:
+        request.membership = load_membership(request.user)
+    return request.membership
+
+
+def invalidate_membership(sender, instance, **kwargs):
+    """
+    Метод сброса кэша принадлежностей пользователя. Кэш сбрасывается
+    после фиксации транзакции, чтобы параллельный запрос не сохранил
+    в нем принадлежности до изменения.
+    """
+    key = MEMBERSHIP_KEY.format(user_id=instance.user_id)
+    transaction.on_commit(partial(get_cache().delete, key))
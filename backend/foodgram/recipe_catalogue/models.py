@@ -1,8 +1,12 @@
 from colorfield.fields import ColorField
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import RowNumber
+from django.utils import timezone
 from users.models import User
 
+from .storage import recipe_image_storage
+
 
 class Tag(models.Model):
     """Модель класса тег."""
@@ -61,31 +65,84 @@ class Ingredient(models.Model):
         ordering = ('-id', )
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('name', 'measurement_unit', ),
+                name='unique_ingredient')
+        ]
 
     def __str__(self):
         return self.name[:30]
 
 
+class RecipeQuerySet(models.QuerySet):
+    """Класс набора запросов к рецептам."""
+
+    def with_related(self):
+        """Метод подгрузки автора, тегов и ингредиентов рецептов."""
+        return self.select_related('author').prefetch_related(
+            'tags', models.Prefetch(
+                'recipeingredients',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient')))
+
+    def latest_per_author(self, limit):
+        """
+        Метод отбора не более limit последних рецептов каждого автора
+        одним запросом с оконной функцией ROW_NUMBER.
+        """
+        ranked = self.order_by().annotate(row_number=models.Window(
+            expression=RowNumber(), partition_by=models.F('author'),
+            order_by=models.F('id').desc())).values('id', 'row_number')
+        sql, params = ranked.query.sql_with_params()
+        return self.extra(
+            where=[
+                f'{self.model._meta.db_table}.id IN (SELECT id FROM ({sql}) '
+                'AS ranked WHERE row_number <= %s)'],
+            params=(*params, limit))
+
+
 class Recipe(models.Model):
     """Модель класса рецепт."""
     author = models.ForeignKey(
-        User, on_delete=models.CASCADE,
+        User, on_delete=models.CASCADE, db_index=False,
         related_name='recipes', verbose_name='Автор')
     name = models.CharField('Название', max_length=200)
     text = models.TextField('Описание')
     cooking_time = models.PositiveIntegerField(
         'Длительность приготовления', validators=[MinValueValidator(1)])
-    image = models.ImageField('Картинка', upload_to='recipe', blank=True, )
+    image = models.ImageField(
+        'Картинка', upload_to='recipe', blank=True,
+        storage=recipe_image_storage)
+    image_variants = models.BooleanField(
+        'Уменьшенные копии картинки готовы', default=False, editable=False)
     ingredients = models.ManyToManyField(
         Ingredient, through='RecipeIngredient',
         related_name='recipes', verbose_name='Ингредиенты')
     tags = models.ManyToManyField(
-        Tag, related_name='recipes', verbose_name='Теги')
+        Tag, through='RecipeTag',
+        related_name='recipes', verbose_name='Теги')
+    favorites_count = models.PositiveIntegerField(
+        'Добавлений в избранное', default=0, editable=False)
+    carts_count = models.PositiveIntegerField(
+        'Добавлений в корзину покупок', default=0, editable=False)
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ('-id', )
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=('author', '-id', ), name='recipe_author_id_idx'),
+            models.Index(
+                fields=('-favorites_count', '-id', ),
+                name='recipe_favorites_count_idx'),
+            models.Index(
+                fields=('cooking_time', 'id', ),
+                name='recipe_cooking_time_idx')
+        ]
 
     def __str__(self):
         return self.name[:30]
@@ -104,10 +161,10 @@ class RecipeIngredient(models.Model):
     """Класс модели связи между рецептами и ингредиентами."""
     recipe = models.ForeignKey(
         Recipe, related_name='recipeingredients',
-        on_delete=models.SET_NULL, null=True)
+        on_delete=models.SET_NULL, null=True, db_index=False)
     ingredient = models.ForeignKey(
         Ingredient, related_name='recipeingredients',
-        on_delete=models.SET_NULL, null=True)
+        on_delete=models.SET_NULL, null=True, db_index=False)
     amount = models.PositiveSmallIntegerField(
         'Количество', validators=[MinValueValidator(1)])
 
@@ -120,19 +177,68 @@ class RecipeIngredient(models.Model):
                 fields=('ingredient', 'recipe', ),
                 name='unique_ingredients_recipe')
         ]
+        indexes = [
+            models.Index(
+                fields=('recipe', 'ingredient', ),
+                name='recipe_ingredient_recipe_idx',
+                condition=models.Q(recipe__isnull=False))
+        ]
 
     def __str__(self):
         return f'{self.ingredient} входит в состав {self.recipe}.'
 
 
+class RecipeTag(models.Model):
+    """Класс модели связи между рецептами и тегами."""
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, db_index=False)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        db_table = 'recipe_catalogue_recipe_tags'
+        verbose_name = 'Тег рецепта'
+        verbose_name_plural = 'Теги рецептов'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('recipe', 'tag', ), name='unique_tag_recipe')
+        ]
+        indexes = [
+            models.Index(
+                fields=('tag', 'recipe', ), name='recipe_tag_tag_recipe_idx')
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} отмечен тегом {self.tag}.'
+
+
+class CreatedField(models.DateTimeField):
+    """
+    Класс поля даты добавления строки. В отличие от default и
+    auto_now_add, при добавлении поля в существующую таблицу старые
+    строки получают NULL, а не дату миграции, и считаются давними.
+    Дата проставляется и при bulk_create.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        if add and getattr(model_instance, self.attname) is None:
+            setattr(model_instance, self.attname, timezone.now())
+        return super().pre_save(model_instance, add)
+
+
 class BaseFavorite(models.Model):
     """Базовый класс избранных рецептов."""
     recipe = models.ForeignKey(
         Recipe, on_delete=models.CASCADE,
         related_name='%(class)ss', verbose_name='Рецепт')
     user = models.ForeignKey(
-        User, on_delete=models.CASCADE,
+        User, on_delete=models.CASCADE, db_index=False,
         related_name='%(class)ss', verbose_name='Пользователь')
+    created = CreatedField('Дата добавления')
 
     class Meta:
         abstract = True
@@ -149,6 +255,9 @@ class Favorite(BaseFavorite):
             models.UniqueConstraint(
                 fields=('user', 'recipe', ), name='unique_favorite')
         ]
+        indexes = [
+            models.Index(fields=('user', '-id', ), name='favorite_user_id_idx')
+        ]
 
     def __str__(self):
         return f'{self.recipe} в избранном у {self.user}.'
@@ -164,6 +273,49 @@ class ShoppingCart(BaseFavorite):
             models.UniqueConstraint(
                 fields=('user', 'recipe', ), name='unique_cart')
         ]
+        indexes = [
+            models.Index(fields=('user', '-id', ), name='cart_user_id_idx')
+        ]
 
     def __str__(self):
         return f'{self.recipe} в корзине покупок у {self.user}.'
+
+
+class RecipeScore(models.Model):
+    """
+    Класс модели предрассчитанной оценки популярности рецепта.
+    Обновляется командой update_scores.
+    """
+    recipe = models.OneToOneField(
+        Recipe, on_delete=models.CASCADE, primary_key=True,
+        related_name='score', verbose_name='Рецепт')
+    trending = models.FloatField(
+        'Оценка популярности за последнее время', default=0)
+
+    class Meta:
+        verbose_name = 'Оценка рецепта'
+        verbose_name_plural = 'Оценки рецептов'
+        indexes = [
+            models.Index(
+                fields=('-trending', '-recipe', ),
+                name='recipe_score_trending_idx')
+        ]
+
+    def __str__(self):
+        return f'{self.recipe}: {self.trending:.2f}.'
+
+
+class ScoreCheckpoint(models.Model):
+    """
+    Класс модели последней обработанной при расчете оценок
+    записи избранного или корзины покупок.
+    """
+    source = models.CharField('Источник', max_length=100, unique=True)
+    last_id = models.BigIntegerField('Последний id', default=0)
+
+    class Meta:
+        verbose_name = 'Отметка расчета оценок'
+        verbose_name_plural = 'Отметки расчета оценок'
+
+    def __str__(self):
+        return f'{self.source}: {self.last_id}.'
@@ -0,0 +1,139 @@
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import defaultdict
+from functools import partial
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+
+from . import models
+
+
+class PantryIndex:
+    """
+    Класс инвертированного индекса рецептов по ингредиентам. Для каждого
+    ингредиента хранит отсортированный массив id рецептов, а для каждого
+    рецепта — его ингредиенты, поэтому подбор рецептов по набору
+    ингредиентов не требует запросов к базе.
+    """
+
+    def __init__(self, rows):
+        postings = defaultdict(list)
+        ingredients = defaultdict(list)
+        for recipe_id, ingredient_id in rows:
+            postings[ingredient_id].append(recipe_id)
+            ingredients[recipe_id].append(ingredient_id)
+        self.postings = {
+            ingredient_id: array('i', sorted(recipe_ids))
+            for ingredient_id, recipe_ids in postings.items()}
+        self.ingredients = {
+            recipe_id: tuple(ingredient_ids)
+            for recipe_id, ingredient_ids in ingredients.items()}
+        self.lock = threading.Lock()
+
+    def set_recipe(self, recipe_id, ingredient_ids):
+        """Метод замены ингредиентов рецепта в индексе."""
+        ingredient_ids = set(ingredient_ids)
+        with self.lock:
+            current = set(self.ingredients.get(recipe_id, ()))
+            for ingredient_id in current - ingredient_ids:
+                recipe_ids = self.postings[ingredient_id]
+                del recipe_ids[bisect_left(recipe_ids, recipe_id)]
+                if not recipe_ids:
+                    del self.postings[ingredient_id]
+            for ingredient_id in ingredient_ids - current:
+                insort(self.postings.setdefault(
+                    ingredient_id, array('i')), recipe_id)
+            if ingredient_ids:
+                self.ingredients[recipe_id] = tuple(ingredient_ids)
+            else:
+                self.ingredients.pop(recipe_id, None)
+
+    def match(self, ingredient_ids, limit):
+        """
+        Метод подбора рецептов по имеющимся ингредиентам. Слиянием
+        отсортированных массивов считается, сколько ингредиентов каждого
+        рецепта уже есть. Рецепты упорядочены по доле имеющихся
+        ингредиентов, затем по числу недостающих.
+        Возвращает кортежи (id рецепта, доля, число недостающих).
+        """
+        with self.lock:
+            merged = heapq.merge(*(
+                self.postings[ingredient_id]
+                for ingredient_id in set(ingredient_ids)
+                if ingredient_id in self.postings))
+            found = []
+            for recipe_id, group in groupby(merged):
+                total = len(self.ingredients[recipe_id])
+                have = sum(1 for _ in group)
+                found.append((have / total, total - have, recipe_id))
+        best = heapq.nsmallest(
+            limit, found, key=lambda item: (-item[0], item[1], -item[2]))
+        return [
+            (recipe_id, coverage, missing)
+            for coverage, missing, recipe_id in best]
+
+
+index = None
+built_at = 0
+
+
+def get_index():
+    """
+    Метод получения индекса. Индекс строится при первом обращении,
+    изменения рецептов этого процесса вносятся в него сразу, а изменения
+    из других процессов подхватываются перестроением по истечении
+    PANTRY_INDEX_TTL секунд.
+    """
+    current = index
+    if current is not None and (
+            time.monotonic() - built_at <= settings.PANTRY_INDEX_TTL):
+        return current
+    return build_index()
+
+
+def build_index():
+    """
+    Метод построения индекса по связям рецептов и ингредиентов.
+    Возвращает построенный индекс, а не глобальную переменную,
+    которую мог изменить другой поток.
+    """
+    global index, built_at
+    current = PantryIndex(models.RecipeIngredient.objects.filter(
+        recipe__isnull=False, ingredient__isnull=False).values_list(
+            'recipe_id', 'ingredient_id').iterator())
+    index, built_at = current, time.monotonic()
+    return current
+
+
+def refresh_recipe(recipe_id):
+    """Метод обновления ингредиентов одного рецепта в индексе."""
+    current = index
+    if current is not None:
+        current.set_recipe(recipe_id, models.RecipeIngredient.objects.filter(
+            recipe_id=recipe_id, ingredient__isnull=False).values_list(
+                'ingredient_id', flat=True))
+
+
+def schedule_refresh(recipe_id):
+    """Метод обновления рецепта в индексе после фиксации транзакции."""
+    transaction.on_commit(partial(refresh_recipe, recipe_id))
+
+
+def recipe_ingredient_changed(sender, instance, **kwargs):
+    if instance.recipe_id is not None:
+        schedule_refresh(instance.recipe_id)
+
+
+def recipe_deleted(sender, instance, **kwargs):
+    current = index
+    if current is not None:
+        transaction.on_commit(partial(current.set_recipe, instance.id, ()))
+
+
+def match_recipes(ingredient_ids, limit):
+    return get_index().match(ingredient_ids, limit)
@@ -1,22 +1,66 @@
+import os
+
+from django.conf import settings
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 
+FONT = 'times'
+FONT_FILE = os.path.join(settings.BASE_DIR, 'timescyr.ttf')
 INGREDIENT = '{num}. {name} - {amount} {unit}'
+TITLE = 'Список ингредиентов'
+LAYOUT = 'layout'
+TOP = 750
+BOTTOM = 50
+LINE_HEIGHT = 25
+
+
+def register_fonts():
+    """
+    Метод регистрации шрифтов. Вызывается один раз при запуске
+    приложения, чтобы не разбирать TTF файл при каждом скачивании.
+    """
+    if FONT not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(FONT, FONT_FILE))
+
+
+def draw_layout(page):
+    """
+    Метод однократной отрисовки заголовка документа,
+    который затем переиспользуется на каждой странице.
+    """
+    page.beginForm(LAYOUT)
+    page.setFont(FONT, size=20)
+    page.drawString(200, 800, TITLE)
+    page.endForm()
+
+
+def new_page(page):
+    """Метод подготовки очередной страницы документа."""
+    page.doForm(LAYOUT)
+    page.setFont(FONT, size=14)
+    return TOP
 
 
-def pfd_table(response, cart):
-    """Метод формирования PDF таблицы."""
-    pdfmetrics.registerFont(TTFont('times', 'timescyr.ttf'))
-    page = canvas.Canvas(response)
-    page.setFont('times', size=20)
-    page.drawString(200, 800, 'Список ингредиентов')
-    page.setFont('times', size=14)
-    height = 750
-    for num, (name, data) in enumerate(cart.items(), 1):
+def pfd_table(buffer, ingredients):
+    """
+    Метод формирования PDF таблицы. Строки, не поместившиеся
+    на странице, переносятся на следующую.
+    """
+    register_fonts()
+    page = canvas.Canvas(buffer)
+    draw_layout(page)
+    height = new_page(page)
+    for num, ingredient in enumerate(ingredients, 1):
+        if height < BOTTOM:
+            page.showPage()
+            height = new_page(page)
         page.drawString(75, height, INGREDIENT.format(
-            num=num, name=name, amount=data['amount'], unit=data['unit']))
-        height -= 25
+            num=num, name=ingredient['ingredient__name'],
+            amount=ingredient['total'],
+            unit=ingredient['ingredient__measurement_unit']))
+        height -= LINE_HEIGHT
     page.showPage()
     page.save()
-    return response
+    buffer.seek(0)
+    return buffer
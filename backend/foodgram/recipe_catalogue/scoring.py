@@ -0,0 +1,87 @@
+import math
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+
+from . import models
+
+# Оценка хранится как log2 суммы 2 ** ((t - EPOCH) / HALF_LIFE) по всем
+# событиям рецепта. Порядок таких сумм не меняется со временем, поэтому
+# затухание не требует пересчета старых оценок: достаточно добавлять
+# новые события, а рецепты без новых событий опускаются сами.
+# Нулевая оценка означает, что событий у рецепта не было.
+EPOCH = datetime(2022, 1, 1)
+WEIGHTS = {
+    models.Favorite: 1.0,
+    models.ShoppingCart: 0.5,
+}
+
+
+def event_score(model, created):
+    """
+    Метод вычисления вклада события в оценку рецепта. События без даты,
+    добавленные до появления оценок, считаются произошедшими в EPOCH.
+    """
+    age = ((created or EPOCH) - EPOCH).total_seconds() / (
+        settings.TRENDING_HALF_LIFE)
+    return age + math.log2(WEIGHTS[model])
+
+
+def log_add(first, second):
+    """Метод сложения двух оценок, заданных логарифмами."""
+    top, bottom = max(first, second), min(first, second)
+    return top + math.log2(1 + 2 ** (bottom - top))
+
+
+def create_missing_scores():
+    """Метод создания оценок для рецептов, у которых их еще нет."""
+    models.RecipeScore.objects.bulk_create(
+        (models.RecipeScore(recipe_id=recipe_id)
+         for recipe_id in models.Recipe.objects.filter(
+             score__isnull=True).values_list('id', flat=True).iterator()),
+        ignore_conflicts=True)
+
+
+def create_score(sender, instance, created, **kwargs):
+    """Метод создания оценки нового рецепта."""
+    if created:
+        models.RecipeScore.objects.get_or_create(recipe=instance)
+
+
+@transaction.atomic
+def update_scores(rebuild=False):
+    """
+    Метод добавления в оценки рецептов событий избранного и корзины
+    покупок, появившихся с прошлого запуска. При rebuild оценки
+    считаются заново, что учитывает и удаленные события.
+    Возвращает количество обновленных рецептов.
+    """
+    create_missing_scores()
+    sources = [model._meta.label_lower for model in WEIGHTS]
+    for source in sources:
+        models.ScoreCheckpoint.objects.get_or_create(source=source)
+    locked = models.ScoreCheckpoint.objects.select_for_update().in_bulk(
+        sources, field_name='source')
+    checkpoints = [locked[source] for source in sources]
+    if rebuild:
+        models.RecipeScore.objects.update(trending=0)
+        for checkpoint in checkpoints:
+            checkpoint.last_id = 0
+    added = {}
+    for model, checkpoint in zip(WEIGHTS, checkpoints):
+        events = model.objects.filter(id__gt=checkpoint.last_id).order_by(
+            'id').values_list('id', 'recipe_id', 'created')
+        for event_id, recipe_id, created in events.iterator():
+            score = event_score(model, created)
+            added[recipe_id] = (
+                log_add(added[recipe_id], score)
+                if recipe_id in added else score)
+            checkpoint.last_id = event_id
+        checkpoint.save(update_fields=('last_id', ))
+    scores = models.RecipeScore.objects.in_bulk(list(added))
+    for recipe_id, score in scores.items():
+        score.trending = log_add(score.trending, added[recipe_id])
+    models.RecipeScore.objects.bulk_update(
+        scores.values(), ('trending', ), batch_size=1000)
+    return len(scores)
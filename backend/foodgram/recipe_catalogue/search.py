@@ -0,0 +1,93 @@
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import transaction
+
+from . import models
+
+
+class IngredientIndex:
+    """
+    Класс неизменяемого индекса ингредиентов для поиска по названию.
+    Хранит отсортированные названия в нижнем регистре, поэтому поиск
+    по префиксу выполняется бинарным поиском.
+    """
+
+    def __init__(self, ingredients):
+        self.ingredients = {
+            ingredient['id']: ingredient for ingredient in ingredients}
+        entries = sorted(
+            (ingredient['name'].lower(), ingredient['id'])
+            for ingredient in self.ingredients.values())
+        self.names = tuple(name for name, _ in entries)
+        self.ids = tuple(pk for _, pk in entries)
+
+    def search(self, query, limit):
+        """
+        Метод поиска ингредиентов: сначала названия, начинающиеся
+        с запроса, затем названия, содержащие его.
+        """
+        query = query.lower()
+        found = []
+        position = bisect_left(self.names, query)
+        while (len(found) < limit and position < len(self.names)
+               and self.names[position].startswith(query)):
+            found.append(self.ids[position])
+            position += 1
+        if len(found) < limit:
+            for name, pk in zip(self.names, self.ids):
+                if query in name and not name.startswith(query):
+                    found.append(pk)
+                    if len(found) == limit:
+                        break
+        return [self.ingredients[pk] for pk in found]
+
+
+index = None
+built_at = 0
+
+
+def get_index():
+    """
+    Метод получения индекса ингредиентов. Индекс строится при первом
+    обращении и перестраивается после изменения ингредиентов или по
+    истечении INGREDIENT_INDEX_TTL секунд, чтобы подхватить изменения,
+    сделанные в других процессах.
+    """
+    current = index
+    if current is not None and (
+            time.monotonic() - built_at <= settings.INGREDIENT_INDEX_TTL):
+        return current
+    return build_index()
+
+
+def build_index():
+    """
+    Метод построения индекса ингредиентов. Возвращает построенный
+    индекс: глобальный index мог уже сбросить reset_index.
+    """
+    global index, built_at
+    current = IngredientIndex(models.Ingredient.objects.values(
+        'id', 'name', 'measurement_unit'))
+    index, built_at = current, time.monotonic()
+    return current
+
+
+def reset_index():
+    """Метод сброса индекса ингредиентов."""
+    global index
+    index = None
+
+
+def invalidate_index(**kwargs):
+    """
+    Метод сброса индекса ингредиентов при их изменении. Индекс
+    сбрасывается после фиксации транзакции, как и индекс pantry,
+    чтобы его не построили заново по еще не сохраненным данным.
+    """
+    transaction.on_commit(reset_index)
+
+
+def search_ingredients(query):
+    return get_index().search(query, settings.INGREDIENT_SEARCH_LIMIT)
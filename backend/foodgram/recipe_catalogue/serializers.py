@@ -1,8 +1,7 @@
-from drf_extra_fields.fields import Base64ImageField
+from django.db import transaction
 from rest_framework import serializers
-from rest_framework.validators import UniqueTogetherValidator
 
-from . import models
+from . import imaging, membership, models, pantry
 
 
 class BaseFavoriteSerializer(serializers.ModelSerializer):
@@ -70,25 +69,34 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.RecipeIngredient
         fields = ('id', 'name', 'amount', 'measurement_unit', )
-        validators = [
-            UniqueTogetherValidator(
-                queryset=models.RecipeIngredient.objects.all(),
-                fields=('ingredient', 'recipe', ))]
+
+
+class IngredientAmountSerializer(serializers.Serializer):
+    """Класс-сериализатор ингредиента рецепта для создания и изменения."""
+    id = serializers.IntegerField()
+    amount = serializers.IntegerField(min_value=1, max_value=32767)
 
 
 class PartialRecipeSerializer(serializers.ModelSerializer):
     """Класс-сериализатор модели рецептов для получения части данных о них."""
-    image = Base64ImageField()
+    image = imaging.RecipeImageField()
+    images = serializers.SerializerMethodField()
 
     class Meta:
         model = models.Recipe
-        fields = ('id', 'name', 'image', 'cooking_time', )
+        fields = ('id', 'name', 'image', 'images', 'cooking_time', )
         read_only_fields = ('id', 'name', 'image', 'cooking_time', )
 
+    def get_images(self, obj):
+        """Метод получения ссылок на уменьшенные копии картинки."""
+        return imaging.variant_urls(
+            obj.image, obj.image_variants, self.context.get('request'))
+
 
 class RecipeSerializer(serializers.ModelSerializer):
     """Класс-сериализатор модели рецепт для создания и изменения."""
-    image = Base64ImageField()
+    image = imaging.RecipeImageField()
+    images = serializers.SerializerMethodField()
     tags = TagSerializer(read_only=True, many=True)
     ingredients = RecipeIngredientSerializer(
         source='recipeingredients', many=True, read_only=True)
@@ -100,7 +108,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         model = models.Recipe
         fields = (
             'id', 'tags', 'author', 'ingredients', 'is_favorited',
-            'is_in_shopping_cart', 'name', 'image', 'text', 'cooking_time', )
+            'is_in_shopping_cart', 'name', 'image', 'images', 'text',
+            'cooking_time', )
 
     def get_author(self, obj):
         """Метод получения информации об авторе рецепта."""
@@ -111,17 +120,78 @@ class RecipeSerializer(serializers.ModelSerializer):
             obj.author, read_only=True,
             context={'request': self.context.get('request')}).data
 
+    def get_images(self, obj):
+        """Метод получения ссылок на уменьшенные копии картинки."""
+        return imaging.variant_urls(
+            obj.image, obj.image_variants, self.context.get('request'))
+
     def get_is_favorited(self, obj):
         """Метод получения информации о том, является ли рецепт избранным."""
-        user = self.context.get('request').user
-        return user.is_authenticated and (
-            user.favorites.filter(recipe__id=obj.id).exists())
+        return obj.id in membership.get_membership(
+            self.context.get('request')).favorites
 
     def get_is_in_shopping_cart(self, obj):
         """Метод получения информации о том, находится ли рецепт в корзине."""
-        user = self.context.get('request').user
-        return user.is_authenticated and (
-            user.shoppingcarts.filter(recipe__id=obj.id).exists())
+        return obj.id in membership.get_membership(
+            self.context.get('request')).shopping_cart
+
+    def validate_tag_ids(self, value):
+        """
+        Метод проверки тегов рецепта. Существование всех тегов
+        проверяется одним запросом.
+        """
+        if not isinstance(value, list) or not value:
+            raise serializers.ValidationError('Укажите хотя бы один тег.')
+        tag_ids = serializers.ListField(
+            child=serializers.IntegerField()).run_validation(value)
+        if len(set(tag_ids)) != len(tag_ids):
+            raise serializers.ValidationError('Теги не должны повторяться.')
+        existing = set(models.Tag.objects.filter(
+            id__in=tag_ids).values_list('id', flat=True))
+        missing = [tag_id for tag_id in tag_ids if tag_id not in existing]
+        if missing:
+            raise serializers.ValidationError(
+                [f'Тег с id={tag_id} не существует.' for tag_id in missing])
+        return tag_ids
+
+    def validate_ingredient_list(self, value):
+        """
+        Метод проверки ингредиентов рецепта. Существование всех
+        ингредиентов проверяется одним запросом.
+        """
+        serializer = IngredientAmountSerializer(
+            data=value, many=True, allow_empty=False)
+        if not serializer.is_valid():
+            raise serializers.ValidationError(serializer.errors)
+        ingredients = serializer.validated_data
+        ingredient_ids = [ingredient['id'] for ingredient in ingredients]
+        if len(set(ingredient_ids)) != len(ingredient_ids):
+            raise serializers.ValidationError(
+                'Ингредиенты не должны повторяться.')
+        existing = set(models.Ingredient.objects.filter(
+            id__in=ingredient_ids).values_list('id', flat=True))
+        missing = [pk for pk in ingredient_ids if pk not in existing]
+        if missing:
+            raise serializers.ValidationError(
+                [f'Ингредиент с id={pk} не существует.' for pk in missing])
+        return ingredients
+
+    def validate(self, data):
+        errors = {}
+        for field, validate in (
+                ('tags', self.validate_tag_ids),
+                ('ingredients', self.validate_ingredient_list)):
+            if field not in self.initial_data:
+                if not self.partial:
+                    errors[field] = ['Обязательное поле.']
+                continue
+            try:
+                data[field] = validate(self.initial_data[field])
+            except serializers.ValidationError as error:
+                errors[field] = error.detail
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
 
     def create_ingredients(self, ingredients, recipe):
         """
@@ -131,22 +201,61 @@ class RecipeSerializer(serializers.ModelSerializer):
         models.RecipeIngredient.objects.bulk_create([models.RecipeIngredient(
             recipe=recipe, ingredient_id=ingredient.get('id'),
             amount=ingredient.get('amount')) for ingredient in ingredients])
+        pantry.schedule_refresh(recipe.id)
 
+    def update_ingredients(self, ingredients, recipe):
+        """
+        Вспомогательный метод изменения ингредиентов рецепта.
+        Затрагивает только добавленные, удаленные и изменившиеся строки.
+        """
+        amounts = {
+            ingredient.get('id'): ingredient.get('amount')
+            for ingredient in ingredients}
+        current = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in recipe.recipeingredients.all()}
+        removed = current.keys() - amounts.keys()
+        if removed:
+            recipe.recipeingredients.filter(
+                ingredient_id__in=removed).delete()
+        changed = []
+        for ingredient_id, recipe_ingredient in current.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and recipe_ingredient.amount != amount:
+                recipe_ingredient.amount = amount
+                changed.append(recipe_ingredient)
+        if changed:
+            models.RecipeIngredient.objects.bulk_update(changed, ('amount', ))
+        self.create_ingredients([
+            {'id': ingredient_id, 'amount': amount}
+            for ingredient_id, amount in amounts.items()
+            if ingredient_id not in current], recipe)
+
+    @transaction.atomic
     def create(self, validated_data):
+        tags = validated_data.pop('tags')
+        ingredients = validated_data.pop('ingredients')
         recipe = models.Recipe.objects.create(**validated_data)
-        recipe.tags.set(self.initial_data.get('tags'))
-        self.create_ingredients(self.initial_data.get('ingredients'), recipe)
+        recipe.tags.set(tags)
+        self.create_ingredients(ingredients, recipe)
+        imaging.schedule_variants(recipe.image)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        instance.image = validated_data.get('image', instance.image)
+        if 'image' in validated_data:
+            instance.image = validated_data['image']
+            instance.image_variants = False
         instance.name = validated_data.get('name', instance.name)
         instance.text = validated_data.get('text', instance.text)
         instance.cooking_time = validated_data.get(
             'cooking_time', instance.cooking_time)
-        instance.tags.clear()
-        instance.tags.set(self.initial_data.get('tags'))
-        instance.recipeingredients.all().delete()
-        self.create_ingredients(self.initial_data.get('ingredients'), instance)
-        instance.save()
+        if 'tags' in validated_data:
+            instance.tags.set(validated_data['tags'])
+        if 'ingredients' in validated_data:
+            self.update_ingredients(validated_data['ingredients'], instance)
+        instance.save(update_fields=(
+            'image', 'image_variants', 'name', 'text', 'cooking_time', ))
+        if 'image' in validated_data:
+            imaging.schedule_variants(instance.image)
         return instance
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from users.models import Subscription
+
+from . import caching, counters, membership, models, pantry, scoring, search
+
+post_save.connect(search.invalidate_index, sender=models.Ingredient)
+post_delete.connect(search.invalidate_index, sender=models.Ingredient)
+
+for model in (models.Tag, models.Ingredient):
+    post_save.connect(caching.invalidate_version, sender=model)
+    post_delete.connect(caching.invalidate_version, sender=model)
+
+for model in (models.Favorite, models.ShoppingCart, Subscription):
+    post_save.connect(membership.invalidate_membership, sender=model)
+    post_delete.connect(membership.invalidate_membership, sender=model)
+
+for model in counters.RECIPE_COUNTERS:
+    post_save.connect(counters.recipe_added, sender=model)
+    post_delete.connect(counters.recipe_removed, sender=model)
+
+post_save.connect(counters.recipe_created, sender=models.Recipe)
+post_delete.connect(counters.recipe_deleted, sender=models.Recipe)
+post_save.connect(scoring.create_score, sender=models.Recipe)
+
+post_save.connect(
+    pantry.recipe_ingredient_changed, sender=models.RecipeIngredient)
+post_delete.connect(
+    pantry.recipe_ingredient_changed, sender=models.RecipeIngredient)
+post_delete.connect(pantry.recipe_deleted, sender=models.Recipe)
@@ -0,0 +1,33 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Класс хранилища, называющего файлы по хэшу их содержимого.
+    Повторная загрузка того же файла не создает новую копию, а только
+    обновляет время изменения существующей, чтобы clean_recipe_images
+    не удалил ее в течение льготного периода.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = os.path.join(directory, digest.hexdigest() + extension)
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return super().save(name, content, max_length)
+        return name
+
+
+recipe_image_storage = ContentAddressedStorage()
@@ -1,38 +1,64 @@
-from api.pagination import PageLimitPagination
-from django.http import HttpResponse
+from api.pagination import OptionalCursorPagination
+from django.http import FileResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import IntegerField, ListField
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-from . import filters, models, pdf, serializers
+from . import (exports, feed, filters, membership, models, pantry, search,
+               serializers)
+from .caching import CachedResponseMixin
 from .permissions import IsAuthorOrReadOnly
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """Класс-контроллер модели тег."""
     serializer_class = serializers.TagSerializer
     queryset = models.Tag.objects.all()
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """Класс-контроллер модели ингредиент."""
     serializer_class = serializers.IngredientSerializer
     queryset = models.Ingredient.objects.all()
-    filter_backends = (filters.IngredientFilter, )
-    search_fields = ('^name',)
+
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name:
+            return self.cached_response(
+                request, lambda: Response(search.search_ingredients(name)))
+        return super().list(request, *args, **kwargs)
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
     """Класс-контроллер модели рецепт."""
     serializer_class = serializers.RecipeSerializer
-    queryset = models.Recipe.objects.all()
-    pagination_class = PageLimitPagination
+    pagination_class = OptionalCursorPagination
     filter_class = filters.RecipeFilter
     permission_classes = (IsAuthorOrReadOnly, )
 
+    def get_queryset(self):
+        return models.Recipe.objects.with_related()
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
+        self.reload(serializer)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        self.reload(serializer)
+
+    def reload(self, serializer):
+        """
+        Вспомогательный метод повторной загрузки сохраненного рецепта
+        вместе со связанными объектами, чтобы ответ формировался
+        без запроса на каждый ингредиент.
+        """
+        serializer.instance = self.get_queryset().get(
+            id=serializer.instance.id)
 
     def create_obj(self, request, recipe):
         """Вспомогательный метод создания объекта избранного/списка покупок."""
@@ -82,16 +108,82 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated, ))
     def download_shopping_cart(self, request):
         """Метод эндпоинта скачивания списка покупок PDF файлом."""
-        ingredients = models.RecipeIngredient.objects.filter(
-            recipe__shoppingcarts__user=request.user).values_list(
-            'ingredient__name', 'amount', 'ingredient__measurement_unit')
-        cart = {}
-        for name, amount, unit in ingredients:
-            if name not in cart:
-                cart[name] = {'amount': amount, 'unit': unit}
-            else:
-                cart[name]['amount'] += amount
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = (
-            'attachment; filename="shopping_list.pdf"')
-        return pdf.pfd_table(response, cart)
+        ingredients = exports.cart_ingredients(request.user)
+        path = exports.render(exports.cart_version(ingredients), ingredients)
+        return FileResponse(
+            open(path, 'rb'), as_attachment=True,
+            filename='shopping_list.pdf')
+
+    @action(
+        methods=['get', 'post'], detail=False,
+        permission_classes=(permissions.IsAuthenticated, ))
+    def shopping_cart_export(self, request):
+        """
+        Метод эндпоинта фонового формирования списка покупок PDF файлом.
+        POST ставит формирование в очередь, GET возвращает его статус.
+        """
+        ingredients = exports.cart_ingredients(request.user)
+        version = exports.cart_version(ingredients)
+        if request.method == 'POST':
+            exports.submit(version, ingredients)
+        export_status = exports.status(version)
+        if export_status is None:
+            return Response(
+                {'errors': 'Формирование списка покупок не запрошено.'},
+                status=status.HTTP_404_NOT_FOUND)
+        data = {'version': version, 'status': export_status}
+        if export_status == exports.DONE:
+            data['file'] = request.build_absolute_uri(
+                exports.artifact_url(version))
+        elif request.method == 'POST':
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+        return Response(data)
+
+    @action(
+        methods=['get'], detail=False,
+        permission_classes=(permissions.IsAuthenticated, ))
+    def feed(self, request):
+        """
+        Метод эндпоинта новейших рецептов авторов, на которых подписан
+        пользователь. Следующая страница задается id последнего
+        рецепта в параметре before.
+        """
+        before = request.query_params.get('before')
+        if before is not None and not before.isdigit():
+            raise ValidationError({'before': 'Укажите id рецепта.'})
+        limit = self.paginator.get_page_size(request)
+        ids = feed.feed_ids(
+            request.user, membership.get_membership(request).subscriptions,
+            before and int(before), limit + 1)
+        recipes = self.get_queryset().filter(
+            id__in=ids[:limit]).order_by('-id')
+        next_link = None
+        if len(ids) > limit:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), 'before', ids[limit - 1])
+        return Response({
+            'next': next_link,
+            'results': self.get_serializer(recipes, many=True).data})
+
+    @action(methods=['get'], detail=False)
+    def cookable(self, request):
+        """
+        Метод эндпоинта подбора рецептов по имеющимся ингредиентам,
+        переданным параметрами ingredients. Рецепты упорядочены по доле
+        имеющихся ингредиентов и числу недостающих.
+        """
+        ingredient_ids = ListField(
+            child=IntegerField(min_value=1),
+            allow_empty=False).run_validation(
+                request.query_params.getlist('ingredients'))
+        matches = pantry.match_recipes(
+            ingredient_ids, self.paginator.get_page_size(request))
+        recipes = self.get_queryset().in_bulk(
+            [recipe_id for recipe_id, _, _ in matches])
+        results = []
+        for recipe_id, coverage, missing in matches:
+            if recipe_id in recipes:
+                data = self.get_serializer(recipes[recipe_id]).data
+                data.update(coverage=round(coverage, 3), missing=missing)
+                results.append(data)
+        return Response({'results': results})
@@ -7,6 +7,8 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     email = models.EmailField('Email', max_length=255, unique=True)
     REQUIRED_FIELDS = ('username', )
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов', default=0, editable=False)
 
     class Meta:
         ordering = ('username', )
@@ -20,7 +22,7 @@ class User(AbstractUser):
 class Subscription(models.Model):
     """Класс модели подписок."""
     user = models.ForeignKey(
-        User, related_name='subscriber',
+        User, related_name='subscriber', db_index=False,
         verbose_name='Подписчик', on_delete=models.CASCADE)
     author = models.ForeignKey(
         User, related_name='subscribing',
@@ -38,6 +40,10 @@ class Subscription(models.Model):
                 check=~models.Q(user=models.F('author')),
                 name='prevent_self_subscription')
         ]
+        indexes = [
+            models.Index(
+                fields=('user', '-id', ), name='subscription_user_id_idx')
+        ]
 
     DESCRIPTION = '{subscriber} подписан на {subscribing}.'
 
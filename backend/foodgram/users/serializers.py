@@ -1,11 +1,24 @@
 from django.conf import settings
 from djoser.serializers import UserCreateSerializer, UserSerializer
+from recipe_catalogue.membership import get_membership
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
 from . import models
 
 
+def get_recipes_limit(request):
+    """
+    Метод получения из параметра recipes_limit числа рецептов,
+    выводимых у каждого автора.
+    """
+    try:
+        return serializers.IntegerField(min_value=0).run_validation(
+            request.query_params.get('recipes_limit', settings.PAGE_SIZE))
+    except serializers.ValidationError as error:
+        raise serializers.ValidationError({'recipes_limit': error.detail})
+
+
 class SubscriptionSerializer(serializers.ModelSerializer):
     """Сериализатор класса подписок."""
     user = serializers.PrimaryKeyRelatedField(
@@ -40,7 +53,7 @@ class SubscriptionInfoSerializer(serializers.ModelSerializer):
     last_name = serializers.ReadOnlyField(source='author.last_name')
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.ReadOnlyField(source='author.recipes_count')
 
     class Meta:
         model = models.Subscription
@@ -49,23 +62,19 @@ class SubscriptionInfoSerializer(serializers.ModelSerializer):
 
     def get_is_subscribed(self, obj):
         """Метод проверки подписки пользователя на автора."""
-        return models.Subscription.objects.filter(
-            user=obj.user, author=obj.author).exists()
+        return True
 
     def get_recipes(self, obj):
         """Метод вывода рецептов автора."""
         from recipe_catalogue.serializers import PartialRecipeSerializer
-        request = self.context.get('request')
-        recipes_limit = request.query_params.get(
-            'recipes_limit', settings.PAGE_SIZE)
-        queryset = obj.author.recipes.all()[:int(recipes_limit)]
+        if hasattr(obj.author, 'latest_recipes'):
+            queryset = obj.author.latest_recipes
+        else:
+            queryset = obj.author.recipes.all()[:get_recipes_limit(
+                self.context.get('request'))]
         return PartialRecipeSerializer(
             queryset, many=True).data
 
-    def get_recipes_count(self, obj):
-        """Метод вывода количества рецептов автора."""
-        return obj.author.recipes.count()
-
 
 class UserInfoSerializer(UserSerializer):
     """Сериализатор класса пользователей."""
@@ -79,9 +88,8 @@ class UserInfoSerializer(UserSerializer):
 
     def get_is_subscribed(self, obj):
         """Метод проверки подписки пользователя на автора."""
-        user = self.context.get('request').user
-        return user.is_authenticated and models.Subscription.objects.filter(
-            user=user, author=obj.id).exists()
+        return obj.id in get_membership(
+            self.context.get('request')).subscriptions
 
 
 class UserRegistrationSerializer(UserCreateSerializer):
@@ -1,6 +1,8 @@
-from api.pagination import PageLimitPagination
+from api.pagination import OptionalCursorPagination, PageLimitPagination
+from django.db.models import Prefetch, prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
+from recipe_catalogue.models import Recipe
 from rest_framework import permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -45,11 +47,18 @@ class UserViewSet(UserViewSet):
     @action(
         methods=['get'], detail=False,
         permission_classes=(permissions.IsAuthenticated, ),
-        serializer_class=serializers.SubscriptionInfoSerializer)
+        serializer_class=serializers.SubscriptionInfoSerializer,
+        pagination_class=OptionalCursorPagination)
     def subscriptions(self, request, *args, **kwargs):
         """Метод эндпоинта подписок текущего пользователя."""
-        queryset = request.user.subscriber.all()
+        recipes_limit = serializers.get_recipes_limit(request)
+        queryset = request.user.subscriber.select_related('author')
         pages = self.paginate_queryset(queryset)
+        authors = [subscription.author for subscription in pages]
+        prefetch_related_objects(authors, Prefetch(
+            'recipes', to_attr='latest_recipes',
+            queryset=Recipe.objects.filter(
+                author__in=authors).latest_per_author(recipes_limit)))
         serializer = self.get_serializer(
             pages, many=True, context={'request': request})
         return self.get_paginated_response(serializer.data)